@@ -0,0 +1,95 @@
+import numpy as np  # type: ignore
+
+from typing import Dict, Optional
+
+
+# Samples are packed least significant bits first, as in sigproc.
+_luts: Dict[int, np.ndarray] = {}
+
+
+def lut(nbits: int) -> np.ndarray:
+
+    """"""
+
+    if nbits not in (1, 2, 4):
+        raise ValueError("Cannot unpack {}-bit data.".format(nbits))
+
+    if nbits not in _luts:
+        nper = 8 // nbits
+        mask = (1 << nbits) - 1
+        shifts = np.arange(nper, dtype=np.uint8) * nbits
+        byte = np.arange(256, dtype=np.uint8)[:, None]
+        table = ((byte >> shifts) & mask).astype(np.float32)
+        table.flags.writeable = False
+        _luts[nbits] = table
+
+    return _luts[nbits]
+
+
+def unpack(
+    raw: np.ndarray,
+    nbits: int,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+
+    """"""
+
+    table = lut(nbits)
+    nper = 8 // nbits
+    raw = np.asarray(raw, dtype=np.uint8).ravel()
+
+    if out is None:
+        out = np.empty(raw.size * nper, dtype=np.float32)
+    elif out.size != raw.size * nper or out.dtype != np.float32:
+        raise ValueError("Output buffer does not match the unpacked size.")
+
+    np.take(
+        table,
+        raw,
+        axis=0,
+        out=out.reshape(raw.size, nper),
+    )
+
+    return out
+
+
+def unpackrange(
+    raw: np.ndarray,
+    nbits: int,
+    start: int,
+    stop: int,
+) -> np.ndarray:
+
+    """"""
+
+    nper = 8 // nbits
+    first = max(start, 0) // nper
+    last = -(-stop // nper)
+    data = unpack(raw[first:last], nbits)
+    return data[start - first * nper : stop - first * nper]
+
+
+def pack(
+    data: np.ndarray,
+    nbits: int,
+) -> np.ndarray:
+
+    """"""
+
+    if nbits not in (1, 2, 4):
+        raise ValueError("Cannot pack {}-bit data.".format(nbits))
+
+    nper = 8 // nbits
+    mask = (1 << nbits) - 1
+    data = np.asarray(data).ravel()
+
+    nbytes = -(-data.size // nper)
+    vals = np.zeros(nbytes * nper, dtype=np.uint8)
+    np.clip(np.rint(data), 0, mask, out=vals[: data.size], casting="unsafe")
+
+    if nbits == 1:
+        return np.packbits(vals, bitorder="little")
+
+    vals = vals.reshape(nbytes, nper)
+    vals <<= np.arange(nper, dtype=np.uint8) * nbits
+    return np.bitwise_or.reduce(vals, axis=1)
@@ -1,3 +1,5 @@
-from .fourier import Fourier
+from .fourier import Fourier, FrequencyAxis
+from .stack import FourierStack
+from .accel import AccelSearch
 
-__all__ = ["Fourier"]
+__all__ = ["Fourier", "FrequencyAxis", "FourierStack", "AccelSearch"]
@@ -0,0 +1,211 @@
+import attr
+import numpy as np  # type: ignore
+
+from collections import deque
+from . import kernels
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple, Iterator, Optional, Sequence
+
+
+candtype = [
+    ("r", np.float64),
+    ("z", np.float64),
+    ("freq", np.float64),
+    ("fdot", np.float64),
+    ("power", np.float32),
+    ("sigma", np.float32),
+]
+
+
+@attr.s(auto_attribs=True)
+class AccelSearch(object):
+
+    """"""
+
+    fourier: Any
+    zmax: float = 200.0
+    dz: float = 2.0
+    numbetween: int = 2
+    nterms: int = 32
+    fftlen: int = 1 << 13
+    workers: Optional[int] = None
+
+    _templates: Dict[Tuple, np.ndarray] = attr.ib(
+        factory=dict,
+        init=False,
+        repr=False,
+        eq=False,
+    )
+
+    @property
+    def zs(self) -> np.ndarray:
+
+        """"""
+
+        nz = int(np.floor(self.zmax / self.dz))
+        return np.arange(-nz, nz + 1) * self.dz
+
+    @property
+    def hw(self) -> int:
+
+        """"""
+
+        return kernels.halfwidth(self.zmax, self.nterms) * self.numbetween
+
+    @property
+    def nfft(self) -> int:
+
+        """"""
+
+        nfft = max(int(self.fftlen), 1)
+        while nfft < 4 * self.hw:
+            nfft *= 2
+        return nfft
+
+    def templates(self) -> np.ndarray:
+
+        """"""
+
+        key = (self.zmax, self.dz, self.numbetween, self.nterms, self.nfft)
+        if key not in self._templates:
+            hw = self.hw // self.numbetween
+            wrapped = np.zeros((self.zs.size, self.nfft), dtype=np.complex64)
+            offsets = np.arange(-self.hw, self.hw + 1) % self.nfft
+            for row, z in zip(wrapped, self.zs):
+                row[offsets] = kernels.response(
+                    float(z),
+                    self.numbetween,
+                    self.nterms,
+                    hw,
+                )
+            self._templates[key] = np.conj(np.fft.fft(wrapped, axis=1))
+        return self._templates[key]
+
+    def _block(
+        self,
+        start: int,
+        step: int,
+    ) -> np.ndarray:
+
+        """"""
+
+        # NOTE: Overlap-save: the block of the spread-out spectrum reaches hw
+        # samples past the outputs on either side, and the outputs that
+        # the circular correlation wraps around into are thrown away.
+        data = self.fourier.data
+        nb = self.numbetween
+        lo = start - self.hw
+
+        seg = np.zeros(self.nfft, dtype=np.complex64)
+        first = max(-(-lo // nb), 0)
+        last = min(-(-(lo + self.nfft) // nb), data.shape[-1])
+        if last > first:
+            seg[first * nb - lo : last * nb - lo : nb] = data[first:last]
+
+        plane = np.fft.ifft(np.fft.fft(seg) * self.templates(), axis=1)
+        plane = plane[:, self.hw : self.hw + step]
+        return (plane.real ** 2 + plane.imag ** 2).astype(np.float32)
+
+    def planes(
+        self,
+        start: float = 0.0,
+        stop: Optional[float] = None,
+    ) -> Iterator[Tuple[float, np.ndarray]]:
+
+        """"""
+
+        nb = self.numbetween
+        nbins = self.fourier.data.shape[-1]
+        stop = nbins if stop is None else min(stop, nbins)
+        lo = int(np.floor(max(start, 0.0) * nb))
+        hi = int(np.ceil(stop * nb))
+        step = self.nfft - 2 * self.hw
+        self.templates()
+
+        workers = self.workers or 1
+        blocks = iter(range(lo, hi, step))
+        pending: deque = deque()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+
+            def fill() -> None:
+                for s in blocks:
+                    n = min(step, hi - s)
+                    pending.append((s, pool.submit(self._block, s, n)))
+                    if len(pending) >= 2 * workers:
+                        break
+
+            fill()
+            while pending:
+                s, future = pending.popleft()
+                yield s / nb, future.result()
+                fill()
+
+    def search(
+        self,
+        threshold: float = 10.0,
+        k: int = 64,
+        zmaxes: Optional[Sequence[float]] = None,
+        start: float = 1.0,
+        stop: Optional[float] = None,
+    ) -> Dict[float, np.ndarray]:
+
+        """"""
+
+        zmaxes = [self.zmax] if zmaxes is None else sorted(zmaxes)
+        rows = [np.flatnonzero(np.abs(self.zs) <= zmax) for zmax in zmaxes]
+        found: Dict[float, list] = {zmax: [] for zmax in zmaxes}
+
+        for r, plane in self.planes(start, stop):
+            for zmax, idx in zip(zmaxes, rows):
+                sub = plane[idx]
+                best = sub.argmax(axis=0)
+                peak = sub[best, np.arange(sub.shape[1])]
+                bins, pows = kernels.peaks(peak, threshold, k)
+                found[zmax].append(
+                    (
+                        r + bins / self.numbetween,
+                        self.zs[idx][best[bins]],
+                        pows,
+                    )
+                )
+
+        T = self.fourier.nsamp * self.fourier.tsamp
+        results = {}
+        for zmax in zmaxes:
+            parts = found[zmax] or [(np.zeros(0), np.zeros(0), np.zeros(0))]
+            rs, zs, pows = [np.concatenate(x) for x in zip(*parts)]
+            rs, zs, pows = merge(rs, zs, pows, 1.0 / self.numbetween)
+            keep, _ = kernels.topk(pows, k)
+
+            cands = np.zeros(keep.size, dtype=candtype)
+            cands["r"] = rs[keep]
+            cands["z"] = zs[keep]
+            cands["freq"] = rs[keep] / T
+            cands["fdot"] = zs[keep] / T ** 2
+            cands["power"] = pows[keep]
+            cands["sigma"] = kernels.sigma(pows[keep], 1)
+            results[zmax] = cands
+
+        return results
+
+
+def merge(
+    rs: np.ndarray,
+    zs: np.ndarray,
+    pows: np.ndarray,
+    spacing: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    """"""
+
+    if rs.size == 0:
+        return rs, zs, pows
+
+    order = np.argsort(rs, kind="stable")
+    rs, zs, pows = rs[order], zs[order], pows[order]
+    group = np.cumsum(np.concatenate(([True], np.diff(rs) > 1.5 * spacing))) - 1
+    best = np.zeros(group[-1] + 1, dtype=np.int64)
+    order = np.lexsort((pows, group))
+    best[group[order]] = order
+    return rs[best], zs[best], pows[best]
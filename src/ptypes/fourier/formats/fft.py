@@ -5,7 +5,11 @@ from typing import Tuple, Optional
 from ptypes.metadata import Metadata
 
 
-def fftread(f: str) -> Tuple[Metadata, np.ndarray]:
+def fftread(
+    f: str,
+    mmap: bool = False,
+    mode: str = "r",
+) -> Tuple[Metadata, np.ndarray]:
 
     """"""
 
@@ -17,11 +21,18 @@ def fftread(f: str) -> Tuple[Metadata, np.ndarray]:
 
     meta = Metadata.frominf(str(inf))
 
-    with open(f, "rb") as fobj:
-        data = np.fromfile(
-            fobj,
-            dtype="float32",
+    if mmap:
+        data = np.memmap(
+            f,
+            dtype="complex64",
+            mode=mode,
         )
+    else:
+        with open(f, "rb") as fobj:
+            data = np.fromfile(
+                fobj,
+                dtype="complex64",
+            )
 
     return meta, data
 
@@ -37,9 +48,9 @@ def fftwrite(
     inf = meta["fname"]
 
     if not f:
-        f = str(Path(inf).with_suffix(".dat"))
+        f = str(Path(inf).with_suffix(".fft"))
 
     meta.toinf(str(inf))
 
     with open(f, "wb+") as fobj:
-        data.tofile(fobj)
+        data.astype("complex64", copy=False).tofile(fobj)
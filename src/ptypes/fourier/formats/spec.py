@@ -2,6 +2,7 @@ import numpy as np  # type: ignore
 
 from pathlib import Path
 from typing import Tuple
+from ptypes.bits import pack, unpack
 from ptypes.metadata import Metadata
 
 
@@ -26,8 +27,15 @@ def specread(f: str) -> Tuple[Metadata, np.ndarray]:
         fobj.seek(meta["size"])
 
         nbits = meta.get("nbits", None)
+        nsamples = meta.get("nsamples", None)
 
-        if nbits:
+        if nbits in (1, 2, 4):
+            raw = np.fromfile(
+                fobj,
+                dtype=np.uint8,
+            )
+            data = unpack(raw, nbits)[:nsamples]
+        elif nbits:
             dtype = bits2dtypes[nbits]
             data = np.fromfile(
                 fobj,
@@ -54,4 +62,10 @@ def specwrite(
     meta.tohdr(f)
 
     with open(f, "ab") as fobj:
+
+        nbits = meta.get("nbits", None)
+
+        if nbits in (1, 2, 4):
+            data = pack(data, nbits)
+
         data.tofile(fobj)
@@ -3,29 +3,287 @@ import numpy as np  # type: ignore
 
 from pathlib import Path
 from ptypes.metadata import NoMeta, Metadata
+from . import kernels
+from .accel import AccelSearch
 from .formats import fftread, fftwrite, specread, specwrite
-from typing import Any, Type, List, Dict, Tuple, TypeVar, Optional
+from typing import (
+    Any,
+    Type,
+    List,
+    Dict,
+    Tuple,
+    Union,
+    TypeVar,
+    Iterator,
+    Optional,
+    Sequence,
+)
 
 
 F = TypeVar("F", bound="Fourier")
 
 
+@attr.s(auto_attribs=True, frozen=True)
+class FrequencyAxis(object):
+
+    """"""
+
+    start: float
+    step: float
+    n: int
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: Union[int, slice]) -> Any:
+        if isinstance(i, slice):
+            return self.start + np.arange(*i.indices(self.n)) * self.step
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError("Frequency index out of range.")
+        return self.start + i * self.step
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        return self[:].astype(dtype) if dtype else self[:]
+
+    @property
+    def stop(self) -> float:
+        return self.start + self.n * self.step
+
+    def index(self, f: Any) -> Any:
+
+        """"""
+
+        return np.rint((np.asarray(f) - self.start) / self.step).astype(np.int64)
+
+
+def _invalidate(
+    fourier: "Fourier",
+    attribute: Any,
+    value: np.ndarray,
+) -> np.ndarray:
+    fourier.invalidate()
+    return value
+
+
 @attr.s(auto_attribs=True)
 class Fourier(object):
 
     """"""
 
-    data: np.ndarray
+    data: np.ndarray = attr.ib(on_setattr=_invalidate)
 
     nsamp: int
     tsamp: float
 
-    freq: np.ndarray
-    phas: np.ndarray
-    pows: np.ndarray
-
     meta: Optional[Metadata] = None
 
+    _phas: Optional[np.ndarray] = attr.ib(
+        default=None,
+        init=False,
+        repr=False,
+        eq=False,
+    )
+    _pows: Optional[np.ndarray] = attr.ib(
+        default=None,
+        init=False,
+        repr=False,
+        eq=False,
+    )
+
+    @property
+    def freq(self) -> FrequencyAxis:
+
+        """"""
+
+        return FrequencyAxis(
+            0.0,
+            1.0 / (self.nsamp * self.tsamp),
+            self.data.size,
+        )
+
+    @property
+    def phas(self) -> np.ndarray:
+
+        """"""
+
+        if self._phas is None:
+            self._phas = np.angle(self.data)
+        return self._phas
+
+    @property
+    def pows(self) -> np.ndarray:
+
+        """"""
+
+        if self._pows is None:
+            self._pows = self.data.real ** 2 + self.data.imag ** 2
+        return self._pows
+
+    def invalidate(self) -> None:
+
+        """"""
+
+        self._phas = None
+        self._pows = None
+
+    def _out(
+        self: F,
+        inplace: bool = False,
+    ) -> np.ndarray:
+
+        """"""
+
+        if inplace and self.data.flags.writeable:
+            return self.data
+        return np.empty(self.data.shape, dtype=np.result_type(self.data, np.complex64))
+
+    def _result(
+        self: F,
+        data: np.ndarray,
+        inplace: bool = False,
+    ) -> Any:
+
+        """"""
+
+        if inplace:
+            self.data = data
+            return None
+        else:
+            return type(self)(
+                data,
+                nsamp=self.nsamp,
+                tsamp=self.tsamp,
+                meta=Metadata(self.meta) if self.meta else self.meta,
+            )
+
+    def whiten(
+        self: F,
+        method: str = "blockmedian",
+        startwidth: int = 6,
+        endwidth: int = 100,
+        endfreq: float = 6.0,
+        inplace: bool = False,
+    ) -> Any:
+
+        """"""
+
+        if method != "blockmedian":
+            raise ValueError("Unknown whitening method: {}".format(method))
+
+        endbin = endfreq * self.nsamp * self.tsamp
+        data = kernels.rednoise(
+            self.data,
+            self._out(inplace),
+            startwidth=startwidth,
+            endwidth=endwidth,
+            endbin=endbin,
+        )
+        return self._result(data, inplace)
+
+    def zap(
+        self: F,
+        birdies: Sequence[Tuple[float, float, int]],
+        grow: bool = False,
+        inplace: bool = False,
+    ) -> Any:
+
+        """"""
+
+        nbins = self.data.shape[-1]
+        idx = kernels.zapbins(birdies, self.freq.step, nbins, grow=grow)
+
+        data = self._out(inplace)
+        if data is not self.data:
+            data[...] = self.data
+        data[..., idx] = 0
+        return self._result(data, inplace)
+
+    def harmonic_sum(
+        self,
+        nharms: Sequence[int] = (1, 2, 4, 8, 16, 32),
+        k: int = 64,
+    ) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+
+        """"""
+
+        return kernels.harmonicsum(self.pows, nharms, k)
+
+    def candidates(
+        self,
+        threshold: float,
+        k: int = 64,
+        nharm: int = 1,
+    ) -> np.ndarray:
+
+        """"""
+
+        _, total = next(kernels.harmonicsums(self.pows, [nharm]))
+        bins, pows = kernels.peaks(total[1:], threshold, k)
+        bins += 1
+
+        cands = np.zeros(
+            bins.size,
+            dtype=[
+                ("bin", np.int64),
+                ("freq", np.float64),
+                ("power", np.float32),
+                ("sigma", np.float32),
+                ("nharm", np.int64),
+            ],
+        )
+        cands["bin"] = bins
+        cands["freq"] = self.freq.start + bins * self.freq.step
+        cands["power"] = pows
+        cands["sigma"] = kernels.sigma(pows, nharm)
+        cands["nharm"] = nharm
+        return cands
+
+    def interbin(self: F) -> F:
+
+        """"""
+
+        return type(self)(
+            kernels.interbin(self.data),
+            nsamp=2 * self.nsamp,
+            tsamp=self.tsamp,
+            meta=Metadata(self.meta) if self.meta else self.meta,
+        )
+
+    def interpolate(
+        self,
+        r: Union[float, Sequence[float], np.ndarray],
+        nterms: int = 32,
+    ) -> np.ndarray:
+
+        """"""
+
+        return kernels.interpolate(self.data, r, nterms=nterms)
+
+    def accelsearch(
+        self,
+        zmax: float = 200.0,
+        threshold: float = 10.0,
+        k: int = 64,
+        zmaxes: Optional[Sequence[float]] = None,
+        workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Dict[float, np.ndarray]:
+
+        """"""
+
+        return AccelSearch(
+            self,
+            zmax=zmax,
+            workers=workers,
+            **kwargs,
+        ).search(
+            threshold=threshold,
+            k=k,
+            zmaxes=zmaxes,
+        )
+
     @classmethod
     def fromnpy(
         cls: Type[F],
@@ -37,17 +295,10 @@ class Fourier(object):
 
         """"""
 
-        freq = np.fft.fftfreq(nsamp, tsamp)
-        phas = np.angle(d)
-        pows = np.abs(d) ** 2
-
         return cls(
             d,
             nsamp=nsamp,
             tsamp=tsamp,
-            freq=freq,
-            phas=phas,
-            pows=pows,
             meta=meta,
         )
 
@@ -55,11 +306,13 @@ class Fourier(object):
     def fromfft(
         cls: Type[F],
         f: str,
+        mmap: bool = False,
+        mode: str = "r",
     ) -> F:
 
         """"""
 
-        meta, data = fftread(f)
+        meta, data = fftread(f, mmap=mmap, mode=mode)
         nsamp = meta["nsamp"]
         tsamp = meta["tsamp"]
         return cls.fromnpy(
@@ -87,6 +340,19 @@ class Fourier(object):
             meta=meta,
         )
 
+    def iterbins(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        chunk: int = 1 << 16,
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+
+        """"""
+
+        stop = self.data.size if stop is None else min(stop, self.data.size)
+        for i in range(max(start, 0), stop, chunk):
+            yield i, self.data[i : min(i + chunk, stop)]
+
     def tonpy(self) -> np.ndarray:
 
         """"""
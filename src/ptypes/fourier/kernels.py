@@ -0,0 +1,406 @@
+import numpy as np  # type: ignore
+
+from functools import lru_cache
+from typing import Dict, Tuple, Iterator, Sequence
+
+
+def topk(
+    x: np.ndarray,
+    k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+
+    """"""
+
+    k = max(min(int(k), x.shape[-1]), 0)
+    if k == 0:
+        empty = x[..., :0]
+        return np.zeros(empty.shape, dtype=np.int64), empty.copy()
+
+    idx = np.argpartition(x, -k, axis=-1)[..., -k:]
+    vals = np.take_along_axis(x, idx, axis=-1)
+    order = np.argsort(-vals, axis=-1, kind="stable")
+    idx = np.take_along_axis(idx, order, axis=-1)
+    vals = np.take_along_axis(vals, order, axis=-1)
+    return idx.astype(np.int64), vals
+
+
+def harmonicsums(
+    pows: np.ndarray,
+    nharms: Sequence[int],
+) -> Iterator[Tuple[int, np.ndarray]]:
+
+    """"""
+
+    nharms = sorted({int(h) for h in nharms})
+    if not nharms or nharms[0] < 1:
+        raise ValueError("Harmonic counts must be positive integers.")
+
+    # NOTE: The yielded sums are views into one running buffer, so they are
+    # only valid until the next level is asked for.
+    nbins = pows.shape[-1]
+    total = None
+    done = 0
+    for nharm in nharms:
+        size = (nbins - 1) // nharm + 1
+        if total is None:
+            total = np.zeros(pows.shape[:-1] + (size,), dtype=np.float32)
+        else:
+            total = total[..., :size]
+
+        for h in range(done + 1, nharm + 1):
+            total += pows[..., : h * size : h]
+        done = nharm
+
+        yield nharm, total
+
+
+def harmonicsum(
+    pows: np.ndarray,
+    nharms: Sequence[int],
+    k: int,
+) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+
+    """"""
+
+    peaks = {}
+    for nharm, total in harmonicsums(pows, nharms):
+        bins, vals = topk(total[..., 1:], k)
+        peaks[nharm] = (bins + 1, vals)
+    return peaks
+
+
+def logpoisson(
+    pows: np.ndarray,
+    lo: int,
+    hi: int,
+) -> np.ndarray:
+
+    """"""
+
+    # NOTE: log of exp(-P) * sum_{lo <= k < hi} P^k / k!, done in log space
+    # so that it neither overflows nor underflows for very large powers.
+    p = np.maximum(np.asarray(pows, dtype=np.float64), 1e-300)
+    k = np.arange(hi, dtype=np.float64)
+    logfact = np.concatenate(([0.0], np.cumsum(np.log(k[1:]))))
+    terms = np.log(p)[..., None] * k[lo:] - logfact[lo:]
+    top = terms.max(axis=-1)
+    return top + np.log(np.exp(terms - top[..., None]).sum(axis=-1)) - p
+
+
+def logsf(
+    pows: np.ndarray,
+    nharm: int,
+) -> np.ndarray:
+
+    """"""
+
+    # NOTE: The sum of nharm normalised powers is half a chi-square with
+    # 2 * nharm degrees of freedom, whose survival function has the closed
+    # form exp(-P) * sum_{k < nharm} P^k / k!.
+    return logpoisson(pows, 0, nharm)
+
+
+def sigma(
+    pows: np.ndarray,
+    nharm: int,
+) -> np.ndarray:
+
+    """"""
+
+    # NOTE: Abramowitz and Stegun 26.2.23 (error below 4.5e-4) only needs
+    # the log of the tail probability, so it holds for arbitrarily small
+    # ones. Below the median the lower tail is used instead.
+    logp = logsf(pows, nharm)
+    upper = logp <= np.log(0.5)
+    near = logp > -1e-12
+    with np.errstate(divide="ignore"):
+        logq = np.log1p(-np.exp(np.minimum(logp, -1e-12)))
+    logq = np.where(near, logpoisson(pows, nharm, nharm + 64), logq)
+    logq = np.where(upper, logp, logq)
+
+    t = np.sqrt(-2.0 * logq)
+    num = 2.515517 + t * (0.802853 + t * 0.010328)
+    den = 1.0 + t * (1.432788 + t * (0.189269 + t * 0.001308))
+    z = t - num / den
+    return np.where(upper, z, -z)
+
+
+def peaks(
+    x: np.ndarray,
+    threshold: float,
+    k: int,
+    block: int = 1 << 20,
+) -> Tuple[np.ndarray, np.ndarray]:
+
+    """"""
+
+    empty = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=x.dtype)
+    if k <= 0:
+        return empty
+
+    starts, stops, bins, vals = [], [], [], []
+    for i in range(0, x.size, block):
+        seg = x[i : i + block]
+        above = np.flatnonzero(seg > threshold)
+        if above.size == 0:
+            continue
+
+        breaks = np.flatnonzero(np.diff(above) > 1) + 1
+        first = np.concatenate(([0], breaks))
+        last = np.concatenate((breaks, [above.size]))
+        runs = np.repeat(np.arange(first.size), last - first)
+
+        order = np.lexsort((seg[above], runs))
+        brightest = above[order[last - 1]]
+
+        keep, _ = topk(seg[brightest], k)
+        keep.sort()
+        bins.append(brightest[keep] + i)
+        vals.append(seg[brightest[keep]])
+        starts.append(above[first[keep]] + i)
+        stops.append(above[last[keep] - 1] + i + 1)
+
+    if not vals:
+        return empty
+
+    starts = np.concatenate(starts)
+    stops = np.concatenate(stops)
+    bins = np.concatenate(bins)
+    vals = np.concatenate(vals)
+    if vals.size == 0:
+        return empty
+
+    joined = np.concatenate(([False], starts[1:] == stops[:-1]))
+    group = np.cumsum(~joined) - 1
+    best = np.zeros(group[-1] + 1, dtype=np.int64)
+    order = np.lexsort((vals, group))
+    best[group[order]] = order
+
+    keep, _ = topk(vals[best], k)
+    return bins[best][keep], vals[best][keep]
+
+
+def power(data: np.ndarray) -> np.ndarray:
+
+    """"""
+
+    return data.real ** 2 + data.imag ** 2
+
+
+def lininterp(
+    x: np.ndarray,
+    centres: np.ndarray,
+    values: np.ndarray,
+) -> np.ndarray:
+
+    """"""
+
+    if centres.size == 1:
+        return np.repeat(values, x.size, axis=-1)
+
+    idx = np.clip(np.searchsorted(centres, x) - 1, 0, centres.size - 2)
+    frac = (x - centres[idx]) / (centres[idx + 1] - centres[idx])
+    frac = np.clip(frac, 0.0, 1.0).astype(np.float32)
+    lo = np.take(values, idx, axis=-1)
+    hi = np.take(values, idx + 1, axis=-1)
+    hi -= lo
+    hi *= frac
+    lo += hi
+    return lo
+
+
+def blockedges(
+    nbins: int,
+    startwidth: int,
+    endwidth: int,
+    endbin: float,
+) -> np.ndarray:
+
+    """"""
+
+    if not 1 <= startwidth <= endwidth:
+        raise ValueError("Block widths must satisfy 1 <= startwidth <= endwidth.")
+
+    edges = [1]
+    logend = np.log(max(endbin, 2.0))
+    while edges[-1] < min(endbin, nbins):
+        r = edges[-1]
+        w = startwidth + (endwidth - startwidth) * np.log(r) / logend
+        edges.append(min(r + min(int(w), endwidth), nbins))
+    return np.asarray(edges, dtype=np.int64)
+
+
+def rednoise(
+    data: np.ndarray,
+    out: np.ndarray,
+    startwidth: int = 6,
+    endwidth: int = 100,
+    endbin: float = 1000.0,
+    chunk: int = 1 << 20,
+) -> np.ndarray:
+
+    """"""
+
+    nbins = data.shape[-1]
+    edges = blockedges(nbins, startwidth, endwidth, endbin)
+
+    meds = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        meds.append(np.median(power(data[..., a:b]), axis=-1)[..., None])
+
+    r = int(edges[-1])
+    nuniform = max(nbins - r, 0) // endwidth
+    rows = max(chunk // endwidth, 1)
+    for i in range(0, nuniform, rows):
+        n = min(rows, nuniform - i)
+        a = r + i * endwidth
+        block = power(data[..., a : a + n * endwidth])
+        block = block.reshape(data.shape[:-1] + (n, endwidth))
+        meds.append(np.median(block, axis=-1))
+
+    edges = np.append(edges, r + endwidth * np.arange(1, nuniform + 1))
+    if edges[-1] < nbins:
+        meds.append(np.median(power(data[..., edges[-1] :]), axis=-1)[..., None])
+        edges = np.append(edges, nbins)
+
+    if not meds:
+        out[...] = data
+        return out
+
+    # NOTE: The median of a chi-square with two degrees of freedom is ln 2
+    # times its mean, so this is the local mean power, interpolated
+    # linearly between the centres of the blocks.
+    level = np.concatenate(meds, axis=-1).astype(np.float32)
+    level /= np.float32(np.log(2.0))
+    centres = 0.5 * (edges[:-1] + edges[1:] - 1)
+
+    for i in range(0, nbins, chunk):
+        j = min(i + chunk, nbins)
+        local = np.sqrt(lininterp(np.arange(i, j), centres, level))
+        scale = np.zeros(local.shape, dtype=np.float32)
+        np.divide(1.0, local, out=scale, where=local > 0)
+        np.multiply(data[..., i:j], scale, out=out[..., i:j])
+
+    out[..., 0] = 1.0
+    return out
+
+
+def zapbins(
+    birdies: Sequence[Tuple[float, float, int]],
+    df: float,
+    nbins: int,
+    grow: bool = False,
+) -> np.ndarray:
+
+    """"""
+
+    if len(birdies) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    birdies = np.asarray(birdies, dtype=np.float64).reshape(-1, 3)
+    freqs, widths, harms = birdies.T
+    harms = np.maximum(harms.astype(np.int64), 1)
+
+    birdie = np.repeat(np.arange(freqs.size), harms)
+    starts = np.cumsum(harms) - harms
+    h = np.arange(birdie.size) - np.repeat(starts, harms) + 1
+    centre = freqs[birdie] * h
+    half = 0.5 * widths[birdie] * (h if grow else 1)
+
+    lo = np.clip(np.rint((centre - half) / df), 0, nbins).astype(np.int64)
+    hi = np.clip(np.rint((centre + half) / df) + 1, 0, nbins).astype(np.int64)
+    hi = np.maximum(hi, lo)
+    sizes = hi - lo
+
+    offsets = np.repeat(lo - (np.cumsum(sizes) - sizes), sizes)
+    return np.unique(offsets + np.arange(sizes.sum()))
+
+
+def interbin(
+    data: np.ndarray,
+) -> np.ndarray:
+
+    """"""
+
+    # NOTE: The half-bin amplitude is pi / 4 times the difference of its two
+    # neighbours, which recovers most of the scalloping loss at a fraction
+    # of the cost of padding the time series to twice its length.
+    nbins = data.shape[-1]
+    out = np.empty(data.shape[:-1] + (max(2 * nbins - 1, 0),), dtype=data.dtype)
+    out[..., ::2] = data
+    np.subtract(data[..., :-1], data[..., 1:], out=out[..., 1::2])
+    out[..., 1::2] *= np.float32(np.pi / 4.0)
+    return out
+
+
+def interpolate(
+    data: np.ndarray,
+    r: np.ndarray,
+    nterms: int = 32,
+    chunk: int = 1 << 16,
+) -> np.ndarray:
+
+    """"""
+
+    # NOTE: A sinusoid at fractional bin r has amplitude exp(i pi (r - k))
+    # sinc(r - k) at bin k, up to a constant, so the amplitude at r is the
+    # sum of that response over the nterms nearest bins, conjugated. Bins
+    # past either end of the spectrum are left out of the sum.
+    r = np.asarray(r, dtype=np.float64)
+    flat = r.ravel()
+    nbins = data.shape[-1]
+    half = max(int(nterms) // 2, 1)
+    offsets = np.arange(-half + 1, half + 1)
+
+    out = np.zeros(flat.size, dtype=np.complex128)
+    for i in range(0, flat.size, chunk):
+        rs = flat[i : i + chunk, None]
+        k = np.floor(rs).astype(np.int64) + offsets
+        valid = (k >= 0) & (k < nbins)
+        x = rs - k
+        resp = np.exp(-1j * np.pi * x) * np.sinc(x)
+        amps = data[np.clip(k, 0, nbins - 1)]
+        out[i : i + chunk] = np.where(valid, amps * resp, 0.0).sum(axis=1)
+
+    return out.reshape(r.shape).astype(np.result_type(data.dtype, np.complex64))
+
+
+def halfwidth(
+    z: float,
+    nterms: int = 32,
+) -> int:
+
+    """"""
+
+    return int(np.ceil(0.5 * abs(z))) + max(int(nterms) // 2, 1)
+
+
+@lru_cache(maxsize=1024)
+def response(
+    z: float,
+    numbetween: int = 2,
+    nterms: int = 32,
+    hw: int = 0,
+) -> np.ndarray:
+
+    """"""
+
+    # NOTE: The Fourier response, at offsets of 1 / numbetween bins out to
+    # hw bins either side, of a sinusoid whose frequency drifts by z bins
+    # over the observation, centred on its mean frequency. It is the
+    # integral over t in [0, 1) of exp(2 pi i (z (t^2 - t) / 2 - q t)),
+    # taken with the midpoint rule on a grid fine enough for the chirp.
+    hw = max(hw, halfwidth(z, nterms))
+    q = np.arange(-hw * numbetween, hw * numbetween + 1) / numbetween
+    m = 8 * (2 * hw + int(np.ceil(abs(z)))) + 256
+    t = (np.arange(m) + 0.5) / m
+
+    phase = -q[:, None] * t + 0.5 * z * (t * t - t)
+    resp = np.exp(2j * np.pi * phase).mean(axis=1)
+
+    # NOTE: Scaled so that correlating unit-mean white noise powers with it
+    # gives unit-mean powers again on the integer bins.
+    resp /= np.sqrt(np.sum(np.abs(resp[::numbetween]) ** 2))
+    resp = resp.astype(np.complex64)
+    resp.flags.writeable = False
+    return resp
@@ -0,0 +1,218 @@
+import attr
+import numpy as np  # type: ignore
+
+from ptypes.metadata import Metadata
+from . import kernels
+from .fourier import Fourier, FrequencyAxis
+from typing import Any, Dict, List, Type, Tuple, TypeVar, Optional, Sequence
+
+
+S = TypeVar("S", bound="FourierStack")
+
+
+@attr.s(auto_attribs=True)
+class FourierStack(object):
+
+    """"""
+
+    data: np.ndarray
+    nsamp: int
+    tsamp: float
+    dms: np.ndarray
+    metas: List[Metadata] = attr.Factory(list)
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __getitem__(self, i: int) -> Fourier:
+        meta = self.metas[i] if self.metas else None
+        return Fourier(
+            self.data[i],
+            nsamp=self.nsamp,
+            tsamp=self.tsamp,
+            meta=meta,
+        )
+
+    @property
+    def ntrials(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def nbins(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def freq(self) -> FrequencyAxis:
+
+        """"""
+
+        return FrequencyAxis(
+            0.0,
+            1.0 / (self.nsamp * self.tsamp),
+            self.nbins,
+        )
+
+    @property
+    def pows(self) -> np.ndarray:
+
+        """"""
+
+        return kernels.power(self.data)
+
+    def _new(
+        self: S,
+        data: np.ndarray,
+    ) -> S:
+
+        """"""
+
+        return type(self)(
+            data,
+            nsamp=self.nsamp,
+            tsamp=self.tsamp,
+            dms=self.dms,
+            metas=self.metas,
+        )
+
+    def _out(
+        self: S,
+        inplace: bool = False,
+    ) -> np.ndarray:
+
+        """"""
+
+        if inplace and self.data.flags.writeable:
+            return self.data
+        return np.empty(
+            self.data.shape,
+            dtype=np.result_type(self.data, np.complex64),
+        )
+
+    def _result(
+        self: S,
+        data: np.ndarray,
+        inplace: bool = False,
+    ) -> Any:
+
+        """"""
+
+        if inplace:
+            self.data = data
+            return None
+        else:
+            return self._new(data)
+
+    def whiten(
+        self: S,
+        method: str = "blockmedian",
+        startwidth: int = 6,
+        endwidth: int = 100,
+        endfreq: float = 6.0,
+        inplace: bool = False,
+    ) -> Any:
+
+        """"""
+
+        if method != "blockmedian":
+            raise ValueError("Unknown whitening method: {}".format(method))
+
+        endbin = endfreq * self.nsamp * self.tsamp
+        data = kernels.rednoise(
+            self.data,
+            self._out(inplace),
+            startwidth=startwidth,
+            endwidth=endwidth,
+            endbin=endbin,
+        )
+        return self._result(data, inplace)
+
+    def zap(
+        self: S,
+        birdies: Sequence[Tuple[float, float, int]],
+        grow: bool = False,
+        inplace: bool = False,
+    ) -> Any:
+
+        """"""
+
+        idx = kernels.zapbins(birdies, self.freq.step, self.nbins, grow=grow)
+
+        data = self._out(inplace)
+        if data is not self.data:
+            data[...] = self.data
+        data[..., idx] = 0
+        return self._result(data, inplace)
+
+    def harmonic_sum(
+        self,
+        nharms: Sequence[int] = (1, 2, 4, 8, 16, 32),
+        k: int = 64,
+    ) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+
+        """"""
+
+        return kernels.harmonicsum(self.pows, nharms, k)
+
+    def candidates(
+        self,
+        threshold: float,
+        k: int = 64,
+        nharm: int = 1,
+    ) -> np.ndarray:
+
+        """"""
+
+        _, total = next(kernels.harmonicsums(self.pows, [nharm]))
+
+        found = []
+        for i, row in enumerate(total):
+            bins, pows = kernels.peaks(row[1:], threshold, k)
+            found.append((np.full(bins.size, i), bins + 1, pows))
+        trials, bins, pows = [np.concatenate(x) for x in zip(*found)]
+
+        cands = np.zeros(
+            bins.size,
+            dtype=[
+                ("trial", np.int64),
+                ("dm", np.float64),
+                ("bin", np.int64),
+                ("freq", np.float64),
+                ("power", np.float32),
+                ("sigma", np.float32),
+                ("nharm", np.int64),
+            ],
+        )
+        cands["trial"] = trials
+        cands["dm"] = self.dms[trials]
+        cands["bin"] = bins
+        cands["freq"] = self.freq.start + bins * self.freq.step
+        cands["power"] = pows
+        cands["sigma"] = kernels.sigma(pows, nharm)
+        cands["nharm"] = nharm
+        return cands
+
+    @classmethod
+    def fromfourier(
+        cls: Type[S],
+        fouriers: Sequence[Fourier],
+        dms: Optional[Sequence[float]] = None,
+    ) -> S:
+
+        """"""
+
+        nsamps = {f.nsamp for f in fouriers}
+        tsamps = {f.tsamp for f in fouriers}
+        if len(nsamps) != 1 or len(tsamps) != 1:
+            raise ValueError("All spectra must share nsamp and tsamp.")
+
+        metas = [f.meta if f.meta else Metadata({}) for f in fouriers]
+        if dms is None:
+            dms = [m.get("dm", 0.0) for m in metas]
+
+        return cls(
+            np.stack([f.data for f in fouriers]),
+            nsamp=nsamps.pop(),
+            tsamp=tsamps.pop(),
+            dms=np.asarray(dms, dtype=np.float64),
+            metas=metas,
+        )
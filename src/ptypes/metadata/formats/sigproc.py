@@ -188,11 +188,16 @@ def sigread(f: str) -> Dict[str, Any]:
 def sigwrite(
     d: Dict[str, Any],
     f: str,
+    patch: bool = False,
 ) -> None:
 
     """"""
 
-    with open(f, "wb+") as fobj:
+    # NOTE: Patching overwrites the header in place and keeps the data that
+    # follows it, so the new header must have the same size as the old one.
+    mode = "rb+" if patch else "wb+"
+
+    with open(f, mode) as fobj:
         sflag.build_stream(None, fobj)
         for key, val in d.items():
             if key in sigkeys.keys():
@@ -134,12 +134,13 @@ class Metadata(dict):
     def tohdr(
         self,
         f: str,
+        patch: bool = False,
     ) -> None:
 
         """"""
 
         attrs = self.todict()
-        sigwrite(attrs, f)
+        sigwrite(attrs, f, patch=patch)
 
     def tofits(
         self,
@@ -1,3 +1,17 @@
-from .tseries import TimeSeries
+from .tseries import TimeSeries, TimeSeriesWriter
+from .lazy import LazyTimeSeries
+from .stack import TimeSeriesStack
+from .store import TimeSeriesStore
+from .loader import load_many, aload_many
+from .quantized import QuantizedTimeSeries
 
-__all__ = ["TimeSeries"]
+__all__ = [
+    "TimeSeries",
+    "LazyTimeSeries",
+    "QuantizedTimeSeries",
+    "TimeSeriesStack",
+    "TimeSeriesStore",
+    "TimeSeriesWriter",
+    "load_many",
+    "aload_many",
+]
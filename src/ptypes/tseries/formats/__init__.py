@@ -1,9 +1,14 @@
-from .dat import datread, datwrite
-from .tim import timread, timwrite
+from .dat import datread, datwrite, DatWriter
+from .tim import timread, timwrite, TimWriter
+from .qts import qtsread, qtswrite
 
 __all__ = [
     "datread",
     "datwrite",
     "timread",
     "timwrite",
+    "qtsread",
+    "qtswrite",
+    "DatWriter",
+    "TimWriter",
 ]
@@ -5,7 +5,10 @@ from pathlib import Path
 from ptypes.metadata import Metadata
 
 
-def datread(f: str) -> typing.Tuple[Metadata, np.ndarray]:
+def datread(
+    f: str,
+    mmap: bool = False,
+) -> typing.Tuple[Metadata, np.ndarray]:
 
     """"""
 
@@ -17,11 +20,18 @@ def datread(f: str) -> typing.Tuple[Metadata, np.ndarray]:
 
     meta = Metadata.frominf(str(inf))
 
-    with open(f, "rb") as fobj:
-        data = np.fromfile(
-            fobj,
+    if mmap:
+        data = np.memmap(
+            f,
             dtype="float32",
+            mode="r",
         )
+    else:
+        with open(f, "rb") as fobj:
+            data = np.fromfile(
+                fobj,
+                dtype="float32",
+            )
 
     return meta, data
 
@@ -43,3 +53,57 @@ def datwrite(
 
     with open(f, "wb+") as fobj:
         data.tofile(fobj)
+
+
+class DatWriter(object):
+
+    """"""
+
+    def __init__(
+        self,
+        f: str,
+        meta: Metadata,
+    ) -> None:
+
+        self.f = str(f)
+        self.inf = str(Path(f).with_suffix(".inf"))
+        self.meta = meta.todict()
+        self.meta["fname"] = self.inf
+        self.nsamp = 0
+        self.fobj = open(self.f, "wb+")
+        self._patch()
+
+    def _patch(self) -> None:
+
+        """"""
+
+        self.meta["nsamp"] = self.nsamp
+        Metadata.fromdict(self.meta).toinf(self.inf)
+
+    def write(
+        self,
+        data: np.ndarray,
+        chunk: int = 1 << 20,
+    ) -> None:
+
+        """"""
+
+        data = np.asarray(data).ravel()
+        for i in range(0, data.size, chunk):
+            block = data[i : i + chunk]
+            block.astype("float32", copy=False).tofile(self.fobj)
+        self.nsamp += data.size
+
+    def close(self) -> None:
+
+        """"""
+
+        if not self.fobj.closed:
+            self.fobj.close()
+            self._patch()
+
+    def __enter__(self) -> "DatWriter":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
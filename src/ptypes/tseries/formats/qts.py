@@ -0,0 +1,88 @@
+import json
+import struct
+import typing
+import numpy as np  # type: ignore
+
+from pathlib import PurePath
+from ptypes.metadata import Metadata
+
+
+# NOTE: A *.qts file is the magic string, the length of a JSON header, the
+# header itself, and then the per-block scales, per-block offsets and codes.
+magic = b"QTS1"
+
+
+def jsonable(obj: typing.Any) -> typing.Any:
+
+    """"""
+
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, PurePath):
+        return str(obj)
+    raise TypeError("Cannot serialise {!r} to JSON.".format(obj))
+
+
+def qtsread(
+    f: str,
+    mmap: bool = False,
+) -> typing.Tuple[Metadata, np.ndarray, np.ndarray, np.ndarray, int]:
+
+    """"""
+
+    with open(f, "rb") as fobj:
+
+        if fobj.read(4) != magic:
+            raise OSError("Not a *.qts file: {}".format(f))
+
+        (hdrlen,) = struct.unpack("<I", fobj.read(4))
+        hdr = json.loads(fobj.read(hdrlen).decode("utf8"))
+
+        nblocks = hdr["nblocks"]
+        scales = np.fromfile(fobj, dtype="<f4", count=nblocks)
+        offsets = np.fromfile(fobj, dtype="<f4", count=nblocks)
+
+        if mmap:
+            codes = np.memmap(
+                f,
+                dtype=hdr["dtype"],
+                mode="r",
+                offset=fobj.tell(),
+                shape=(hdr["nsamp"],),
+            )
+        else:
+            codes = np.fromfile(fobj, dtype=hdr["dtype"], count=hdr["nsamp"])
+
+    meta = Metadata.fromdict(hdr["meta"])
+    return meta, codes, scales, offsets, hdr["block"]
+
+
+def qtswrite(
+    codes: np.ndarray,
+    scales: np.ndarray,
+    offsets: np.ndarray,
+    block: int,
+    meta: Metadata,
+    f: str,
+) -> None:
+
+    """"""
+
+    hdr = {
+        "dtype": codes.dtype.newbyteorder("<").str,
+        "nsamp": codes.size,
+        "block": block,
+        "nblocks": scales.size,
+        "meta": meta.todict(),
+    }
+    hdr = json.dumps(hdr, default=jsonable).encode("utf8")
+
+    with open(f, "wb+") as fobj:
+        fobj.write(magic)
+        fobj.write(struct.pack("<I", len(hdr)))
+        fobj.write(hdr)
+        scales.astype("<f4").tofile(fobj)
+        offsets.astype("<f4").tofile(fobj)
+        codes.astype(codes.dtype.newbyteorder("<")).tofile(fobj)
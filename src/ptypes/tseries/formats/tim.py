@@ -2,6 +2,7 @@ import typing
 import numpy as np  # type: ignore
 
 from pathlib import Path
+from ptypes.bits import pack, unpack
 from ptypes.metadata import Metadata
 
 
@@ -15,19 +16,42 @@ bits2dtypes = {
 }
 
 
-def timread(f: str) -> typing.Tuple[Metadata, np.ndarray]:
+def timread(
+    f: str,
+    mmap: bool = False,
+    packed: bool = False,
+) -> typing.Tuple[Metadata, np.ndarray]:
 
     """"""
 
     meta = Metadata.fromhdr(f)
+    nbits = meta.get("nbits", None)
+    nsamples = meta.get("nsamples", None)
+
+    if mmap:
+        dtype = bits2dtypes[nbits] if nbits else np.float32
+        data = np.memmap(
+            f,
+            dtype=dtype,
+            mode="r",
+            offset=meta["size"],
+        )
+        # NOTE: Sub-byte samples cannot be viewed in place, so they are
+        # unpacked straight from the mapped bytes into a float32 array,
+        # unless the caller asks for the packed bytes to unpack ranges of
+        # them itself, with bits.unpackrange.
+        if nbits in (1, 2, 4) and not packed:
+            data = unpack(data, nbits)[:nsamples]
+        return meta, data
 
     with open(f, "rb") as fobj:
 
         fobj.seek(meta["size"])
 
-        nbits = meta.get("nbits", None)
-
-        if nbits:
+        if nbits in (1, 2, 4):
+            raw = np.fromfile(fobj, dtype=np.uint8)
+            data = unpack(raw, nbits)[:nsamples]
+        elif nbits:
             dtype = bits2dtypes[nbits]
             data = np.fromfile(fobj, dtype=dtype)
             data = data.astype(np.float32)
@@ -45,14 +69,90 @@ def timwrite(
 
     """"""
 
-    meta.tohdr(f)
+    with TimWriter(f, meta) as writer:
+        writer.write(data)
 
-    with open(f, "ab") as fobj:
 
-        nbits = meta.get("nbits", None)
+class TimWriter(object):
 
-        if nbits:
-            dtype = bits2dtypes[nbits]
-            data = data.astype(dtype)
+    """"""
+
+    def __init__(
+        self,
+        f: str,
+        meta: Metadata,
+    ) -> None:
+
+        self.f = str(f)
+        self.meta = meta.todict()
+        self.nbits = self.meta.get("nbits", None)
+        self.nsamples = 0
+        self.carry = np.empty(0, dtype=np.float32)
+        self._patch(patch=False)
+        self.fobj = open(self.f, "ab")
 
-        data.tofile(fobj)
+    def _patch(self, patch: bool = True) -> None:
+
+        """"""
+
+        self.meta["nsamples"] = self.nsamples
+        Metadata.fromdict(self.meta).tohdr(self.f, patch=patch)
+
+    def _encode(self, data: np.ndarray) -> np.ndarray:
+
+        """"""
+
+        if self.nbits in (1, 2, 4):
+            return pack(data, self.nbits)
+        elif self.nbits:
+            return data.astype(bits2dtypes[self.nbits], copy=False)
+        else:
+            return data.astype(np.float32, copy=False)
+
+    def write(
+        self,
+        data: np.ndarray,
+        chunk: int = 1 << 20,
+    ) -> None:
+
+        """"""
+
+        data = np.asarray(data).ravel()
+        self.nsamples += data.size
+
+        # NOTE: Sub-byte samples are packed several to a byte, so samples that
+        # do not fill a whole byte are carried over to the next write.
+        if self.nbits in (1, 2, 4):
+            nper = 8 // self.nbits
+            if self.carry.size:
+                nhead = nper - self.carry.size
+                head = np.concatenate((self.carry, data[:nhead]))
+                data = data[nhead:]
+                if head.size < nper:
+                    self.carry = head
+                    return
+                self._encode(head).tofile(self.fobj)
+            nfull = data.size - data.size % nper
+            self.carry = data[nfull:].astype(np.float32)
+            data = data[:nfull]
+            chunk = chunk - chunk % nper
+
+        for i in range(0, data.size, chunk):
+            self._encode(data[i : i + chunk]).tofile(self.fobj)
+
+    def close(self) -> None:
+
+        """"""
+
+        if not self.fobj.closed:
+            if self.carry.size:
+                self._encode(self.carry).tofile(self.fobj)
+                self.carry = self.carry[:0]
+            self.fobj.close()
+            self._patch()
+
+    def __enter__(self) -> "TimWriter":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
@@ -0,0 +1,439 @@
+import numpy as np  # type: ignore
+
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Union, Iterable, Optional
+from pkernels import fastrmed  # type: ignore
+
+try:
+    import scipy.fft as fftpack  # type: ignore
+except ImportError:
+    fftpack = None
+
+
+def blockweights(
+    nsamp: int,
+    width: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+
+    """"""
+
+    nblocks = max(nsamp // width, 1)
+    if nblocks == 1:
+        return np.zeros(nsamp, dtype=np.intp), np.zeros(nsamp, dtype=np.float32)
+
+    pos = (np.arange(nsamp) - 0.5 * (width - 1)) / width
+    idx = np.clip(np.floor(pos).astype(np.intp), 0, nblocks - 2)
+    frac = np.clip(pos - idx, 0.0, 1.0).astype(np.float32)
+    return idx, frac
+
+
+def upsample(
+    coarse: np.ndarray,
+    nsamp: int,
+    factor: int,
+) -> np.ndarray:
+
+    """"""
+
+    if coarse.shape[-1] == 1:
+        return np.repeat(coarse, nsamp, axis=-1)
+
+    idx, frac = blockweights(nsamp, factor)
+    lo = np.take(coarse, idx, axis=-1)
+    hi = np.take(coarse, idx + 1, axis=-1)
+    hi -= lo
+    hi *= frac
+    lo += hi
+    return lo
+
+
+def blockmedian(
+    data: np.ndarray,
+    width: int,
+) -> np.ndarray:
+
+    """"""
+
+    nsamp = data.shape[-1]
+    width = max(min(int(width), nsamp), 1)
+    nblocks = max(nsamp // width, 1)
+
+    blocks = data[..., : nblocks * width]
+    blocks = blocks.reshape(data.shape[:-1] + (nblocks, width))
+    meds = np.median(blocks, axis=-1).astype(np.float32)
+    return upsample(meds, nsamp, width)
+
+
+def decimatedmedian(
+    data: np.ndarray,
+    width: int,
+    minpts: int = 10,
+    factor: Optional[int] = None,
+) -> np.ndarray:
+
+    """"""
+
+    nsamp = data.shape[-1]
+    if factor is None:
+        factor = width // 16
+    factor = max(min(int(factor), nsamp), 1)
+    nout = nsamp // factor
+
+    coarse = data[: nout * factor].reshape(nout, factor)
+    coarse = coarse.mean(axis=-1, dtype=np.float64).astype(np.float32)
+    runmedian = fastrmed(
+        coarse,
+        max(int(round(width / factor)), 1),
+        minpts,
+    )
+    return upsample(np.asarray(runmedian, dtype=np.float32), nsamp, factor)
+
+
+def fourierbaseline(
+    data: np.ndarray,
+    width: int,
+) -> np.ndarray:
+
+    """"""
+
+    # NOTE: A Gaussian low-pass whose full width at half maximum in time is
+    # the requested width. The FFT makes the filter circular, so the ends
+    # of the series bleed into each other over roughly one width.
+    nsamp = data.shape[-1]
+    sigma = width / (2.0 * np.sqrt(2.0 * np.log(2.0)))
+    freqs = np.fft.rfftfreq(nsamp)
+    spec = np.fft.rfft(data, axis=-1)
+    spec *= np.exp(-2.0 * (np.pi * sigma * freqs) ** 2)
+    return np.fft.irfft(spec, n=nsamp, axis=-1).astype(np.float32)
+
+
+def baseline(
+    data: np.ndarray,
+    width: int,
+    minpts: int = 10,
+    method: str = "runmed",
+) -> np.ndarray:
+
+    """"""
+
+    if method == "runmed":
+        return fastrmed(data, width, minpts)
+    elif method == "decimated":
+        return decimatedmedian(data, width, minpts)
+    elif method == "blockmedian":
+        return blockmedian(data, width)
+    elif method == "fourier":
+        return fourierbaseline(data, width)
+    else:
+        raise ValueError("Unknown dereddening method: {}".format(method))
+
+
+def meanvar(
+    data: np.ndarray,
+    chunk: int = 1 << 20,
+) -> Tuple[float, float]:
+
+    """"""
+
+    return blockstats(data[i : i + chunk] for i in range(0, data.size, chunk))
+
+
+def blockstats(blocks: Iterable[np.ndarray]) -> Tuple[float, float]:
+
+    """"""
+
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+
+    # NOTE: Blocks are combined with Chan et al.'s pairwise update, so the
+    # float64 accumulators never need more than one block in memory at once.
+    for block in blocks:
+        block = block.astype(np.float64)
+        nb = block.size
+        mb = block.mean()
+        block -= mb
+        m2b = np.dot(block, block)
+        delta = mb - mean
+        tot = n + nb
+        mean += delta * nb / tot
+        m2 += m2b + delta * delta * n * nb / tot
+        n = tot
+
+    return mean, m2 / n
+
+
+def outdtype(dtype: np.dtype) -> np.dtype:
+
+    """"""
+
+    if np.issubdtype(dtype, np.floating):
+        return np.dtype(dtype)
+    return np.dtype(np.float32)
+
+
+def outbuffer(
+    data: np.ndarray,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+
+    """"""
+
+    if out is None:
+        return np.empty(data.shape, dtype=outdtype(data.dtype))
+    elif out.shape != data.shape:
+        raise ValueError("Output buffer does not match the data shape.")
+    return out
+
+
+def normalise(
+    data: np.ndarray,
+    out: np.ndarray,
+    chunk: int = 1 << 20,
+) -> np.ndarray:
+
+    """"""
+
+    mean, var = meanvar(data, chunk=chunk)
+    m = out.dtype.type(mean)
+    s = out.dtype.type(var ** 0.5)
+
+    for i in range(0, data.size, chunk):
+        block = out[i : i + chunk]
+        np.subtract(data[i : i + chunk], m, out=block, casting="unsafe")
+        block /= s
+
+    return out
+
+
+def foldmany(
+    data: np.ndarray,
+    tsamp: float,
+    periods: np.ndarray,
+    pdots: np.ndarray,
+    bins: int,
+    subints: int = 1,
+    block: int = 1 << 22,
+) -> np.ndarray:
+
+    """"""
+
+    nsamp = data.size
+    ncand = periods.size
+    ncells = ncand * subints * bins
+
+    freqs = 1.0 / periods
+    fdots = -pdots / periods ** 2
+    offsets = np.arange(ncand, dtype=np.int64)[:, None] * subints * bins
+
+    sums = np.zeros(ncells, dtype=np.float64)
+    hits = np.zeros(ncells, dtype=np.float64)
+
+    # NOTE: Each block of samples is read once and folded at every trial
+    # period together, so the block length shrinks as candidates are added
+    # to keep the (ncand, nblock) index arrays around a fixed size.
+    step = max(block // ncand, 1)
+    for i in range(0, nsamp, step):
+        idx = np.arange(i, min(i + step, nsamp))
+        t = idx * tsamp
+
+        phase = freqs[:, None] * t + 0.5 * fdots[:, None] * t * t
+        phase -= np.floor(phase)
+        cell = (phase * bins).astype(np.int64)
+        np.minimum(cell, bins - 1, out=cell)
+        cell += (idx * subints // nsamp) * bins
+        cell += offsets
+
+        cell = cell.ravel()
+        weights = np.broadcast_to(data[i : i + step], (ncand, idx.size)).ravel()
+        sums += np.bincount(cell, weights=weights, minlength=ncells)
+        hits += np.bincount(cell, minlength=ncells)
+
+    np.divide(sums, hits, out=sums, where=hits > 0)
+    return sums.reshape(ncand, subints, 1, bins).astype(np.float32)
+
+
+def vonmises(
+    nsamp: int,
+    periods: np.ndarray,
+    phi0: np.ndarray,
+    ducy: np.ndarray,
+    amp: np.ndarray,
+    out: np.ndarray,
+    chunk: int = 1 << 22,
+) -> np.ndarray:
+
+    """"""
+
+    # NOTE: Adds one von Mises pulse train per row of out, with periods in
+    # samples. Each pulse train is scaled to an L2 norm of amp, so amp is
+    # the matched-filter S/N the signal would have against unit noise.
+    kappa = np.log(2.0) / (2.0 * np.sin(0.5 * np.pi * ducy) ** 2)
+    t = np.arange(nsamp, dtype=np.float64)
+
+    rows = max(chunk // max(nsamp, 1), 1)
+    for i in range(0, periods.size, rows):
+        j = min(i + rows, periods.size)
+        phase = t / periods[i:j, None] - phi0[i:j, None]
+        np.cos(2.0 * np.pi * phase, out=phase)
+        phase -= 1.0
+        phase *= kappa[i:j, None]
+        np.exp(phase, out=phase)
+        norm = np.sqrt(np.einsum("ij,ij->i", phase, phase))
+        phase *= (amp[i:j] / norm)[:, None]
+        out[i:j] += phase
+
+    return out
+
+
+def injectblock(
+    nsamp: int,
+    periods: np.ndarray,
+    phi0: np.ndarray,
+    ducy: np.ndarray,
+    amp: np.ndarray,
+    seeds: np.ndarray,
+    stdnoise: float = 1.0,
+    base: Optional[np.ndarray] = None,
+) -> np.ndarray:
+
+    """"""
+
+    out = np.empty((periods.size, nsamp), dtype=np.float32)
+
+    if base is not None:
+        out[:] = base
+    else:
+        for row, seed in zip(out, seeds):
+            rng = np.random.default_rng(int(seed))
+            rng.standard_normal(nsamp, dtype=np.float32, out=row)
+            row *= stdnoise
+
+    return vonmises(nsamp, periods, phi0, ducy, amp, out)
+
+
+@lru_cache(maxsize=256)
+def fastlen(
+    n: int,
+    up: bool = True,
+) -> int:
+
+    """"""
+
+    # NOTE: Real FFTs of 5-smooth lengths, n = 2^a 3^b 5^c, are about as
+    # fast as powers of two, and are much closer to n than the next one.
+    best = None
+    p5 = 1
+    while p5 <= 2 * n:
+        p35 = p5
+        while p35 <= 2 * n:
+            m = p35
+            if up:
+                while m < n:
+                    m *= 2
+                if best is None or m < best:
+                    best = m
+            else:
+                while m * 2 <= n:
+                    m *= 2
+                if m <= n and (best is None or m > best):
+                    best = m
+            p35 *= 3
+        p5 *= 5
+    return max(int(best or 1), 1)
+
+
+def rfft(
+    data: np.ndarray,
+    n: int,
+    workers: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+
+    """"""
+
+    nsamp = data.shape[-1]
+    shape = data.shape[:-1] + (n // 2 + 1,)
+    rdtype = np.float64 if data.dtype == np.float64 else np.float32
+    if out is None:
+        out = np.empty(shape, dtype=np.result_type(rdtype, np.complex64))
+    elif out.shape != shape:
+        raise ValueError("Output buffer does not match the number of bins.")
+
+    # NOTE: Padding uses the mean rather than zeros, so the step at the end
+    # of the series does not leak red noise into the low frequency bins.
+    if n > nsamp:
+        x = np.empty(data.shape[:-1] + (n,), dtype=rdtype)
+        x[..., :nsamp] = data
+        x[..., nsamp:] = data.mean(axis=-1, dtype=np.float64, keepdims=True)
+    else:
+        x = np.asarray(data[..., :n], dtype=rdtype)
+
+    def transform(lo: int, hi: int) -> None:
+        out[lo:hi] = np.fft.rfft(x[lo:hi], axis=-1)
+
+    workers = workers or 1
+    if workers > 1 and fftpack is not None:
+        out[...] = fftpack.rfft(x, axis=-1, overwrite_x=n > nsamp, workers=workers)
+    elif workers > 1 and x.ndim > 1:
+        bounds = np.linspace(0, x.shape[0], workers + 1).astype(int)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            jobs = [
+                pool.submit(transform, lo, hi)
+                for lo, hi in zip(bounds[:-1], bounds[1:])
+                if hi > lo
+            ]
+            for job in jobs:
+                job.result()
+    else:
+        out[...] = np.fft.rfft(x, axis=-1)
+    return out
+
+
+windows = {
+    "boxcar": np.ones,
+    "hann": np.hanning,
+    "hamming": np.hamming,
+    "blackman": np.blackman,
+}
+
+
+def window(
+    name: Union[str, np.ndarray, None],
+    n: int,
+) -> np.ndarray:
+
+    """"""
+
+    if name is None:
+        name = "boxcar"
+    if isinstance(name, str):
+        try:
+            w = windows[name](n)
+        except KeyError:
+            raise ValueError("Unknown window: {}".format(name))
+    else:
+        w = np.asarray(name)
+        if w.shape != (n,):
+            raise ValueError("Window does not match the segment length.")
+    return w.astype(np.float32)
+
+
+def segmentpower(
+    data: np.ndarray,
+    w: np.ndarray,
+) -> np.ndarray:
+
+    """"""
+
+    # NOTE: The segment mean is removed before windowing, so the window
+    # does not smear it out of bin 0. Powers are divided by the energy of
+    # the window, which puts unit-variance white noise at unit mean power.
+    x = np.array(data, dtype=np.float32)
+    x -= x.mean(dtype=np.float64)
+    x *= w
+    spec = np.fft.rfft(x)
+    power = spec.real.astype(np.float64) ** 2 + spec.imag.astype(np.float64) ** 2
+    power /= np.dot(w.astype(np.float64), w)
+    return power
@@ -0,0 +1,172 @@
+import attr
+import numpy as np  # type: ignore
+
+from ptypes.metadata import Metadata
+from . import kernels
+from .tseries import TimeSeries
+from pkernels import dsamp  # type: ignore
+from typing import Any, List, Tuple, TypeVar, Optional
+
+
+L = TypeVar("L", bound="LazyTimeSeries")
+
+
+@attr.s(auto_attribs=True)
+class LazyTimeSeries(object):
+
+    """"""
+
+    tseries: Any
+    ops: List[Tuple] = attr.Factory(list)
+    chunk: int = 1 << 18
+
+    @property
+    def tsamp(self) -> float:
+
+        """"""
+
+        tsamp = self.tseries.tsamp
+        for op in self.ops:
+            if op[0] == "downsample":
+                tsamp = tsamp * op[1]
+        return tsamp
+
+    def _record(self: L, *op: Any) -> L:
+
+        """"""
+
+        return attr.evolve(self, ops=self.ops + [op])
+
+    def normalise(self: L) -> L:
+
+        """"""
+
+        return self._record("normalise")
+
+    def deredden(
+        self: L,
+        width: float,
+        minpts: int = 10,
+        method: str = "runmed",
+    ) -> L:
+
+        """"""
+
+        if method not in ("runmed", "decimated", "blockmedian", "fourier"):
+            raise ValueError("Unknown dereddening method: {}".format(method))
+
+        widsamps = int(round(width / self.tsamp))
+        return self._record("deredden", widsamps, minpts, method)
+
+    def downsample(
+        self: L,
+        factor: int,
+    ) -> L:
+
+        """"""
+
+        if factor != int(factor) or factor < 1:
+            raise ValueError("Lazy downsampling needs a positive integer factor.")
+
+        return self._record("downsample", int(factor))
+
+    def _sizes(self) -> List[int]:
+
+        """"""
+
+        sizes = [self.tseries.nsamp]
+        for op in self.ops:
+            if op[0] == "downsample":
+                sizes.append(sizes[-1] // op[1])
+            else:
+                sizes.append(sizes[-1])
+        return sizes
+
+    def _run(
+        self,
+        k: int,
+        a: int,
+        b: int,
+        sizes: List[int],
+        stats: List[Optional[Tuple[float, float]]],
+    ) -> np.ndarray:
+
+        """"""
+
+        if k == 0:
+            return self.tseries.samples(a, b)
+
+        op = self.ops[k - 1]
+
+        if op[0] == "normalise":
+            block = self._run(k - 1, a, b, sizes, stats)
+            m, v = stats[k - 1]  # type: ignore
+            block -= np.float32(m)
+            block /= np.float32(v ** 0.5)
+            return block
+
+        if op[0] == "downsample":
+            f = op[1]
+            block = self._run(k - 1, a * f, b * f, sizes, stats)
+            return np.asarray(dsamp(block, f), dtype=np.float32)
+
+        _, width, minpts, method = op
+        halo = 2 * width
+        lo = max(a - halo, 0)
+
+        # NOTE: Block-based baselines are only reproduced exactly if the
+        # chunk starts on the same block grid as the whole series does.
+        if method == "blockmedian":
+            lo -= lo % max(width, 1)
+        elif method == "decimated":
+            lo -= lo % max(width // 16, 1)
+        hi = min(b + halo, sizes[k - 1])
+
+        block = self._run(k - 1, lo, hi, sizes, stats)
+        block -= kernels.baseline(block, width, minpts, method)
+        return block[a - lo : b - lo]
+
+    def _blocks(
+        self,
+        k: int,
+        sizes: List[int],
+        stats: List[Optional[Tuple[float, float]]],
+    ) -> Any:
+
+        """"""
+
+        factor = sizes[0] // max(sizes[k], 1)
+        step = max(self.chunk // max(factor, 1), 1)
+        for a in range(0, sizes[k], step):
+            b = min(a + step, sizes[k])
+            yield a, b, self._run(k, a, b, sizes, stats)
+
+    def compute(
+        self,
+        out: Optional[np.ndarray] = None,
+    ) -> TimeSeries:
+
+        """"""
+
+        sizes = self._sizes()
+        nops = len(self.ops)
+        stats: List[Optional[Tuple[float, float]]] = [None] * nops
+
+        for k, op in enumerate(self.ops):
+            if op[0] == "normalise":
+                blocks = (block for _, _, block in self._blocks(k, sizes, stats))
+                stats[k] = kernels.blockstats(blocks)
+
+        if out is None:
+            out = np.empty(sizes[-1], dtype=np.float32)
+        elif out.shape != (sizes[-1],):
+            raise ValueError("Output buffer does not match the result size.")
+
+        for a, b, block in self._blocks(nops, sizes, stats):
+            out[a:b] = block
+
+        return TimeSeries(
+            out,
+            self.tsamp,
+            meta=Metadata(self.tseries.meta),
+        )
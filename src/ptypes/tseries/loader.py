@@ -0,0 +1,76 @@
+import asyncio
+
+from .tseries import TimeSeries
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Dict, Tuple, Iterable, Iterator, AsyncIterator
+
+
+def load_many(
+    fs: Iterable[str],
+    workers: int = 8,
+    mmap: bool = False,
+) -> Iterator[Tuple[str, TimeSeries]]:
+
+    """"""
+
+    todo = iter(fs)
+    window = 2 * workers
+    pending: Dict[Future, str] = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+
+        def fill() -> None:
+            for f in todo:
+                pending[pool.submit(TimeSeries.fromfile, f, mmap)] = f
+                if len(pending) >= window:
+                    break
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                f = pending.pop(future)
+                yield f, future.result()
+            fill()
+
+
+async def aload_many(
+    fs: Iterable[str],
+    workers: int = 8,
+    mmap: bool = False,
+) -> AsyncIterator[Tuple[str, TimeSeries]]:
+
+    """"""
+
+    loop = asyncio.get_event_loop()
+    todo = iter(fs)
+    window = 2 * workers
+    pending: Dict[asyncio.Future, str] = {}
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    def fill() -> None:
+        for f in todo:
+            future = loop.run_in_executor(pool, TimeSeries.fromfile, f, mmap)
+            pending[future] = f
+            if len(pending) >= window:
+                break
+
+    try:
+        fill()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                f = pending.pop(future)
+                yield f, future.result()
+                fill()
+    finally:
+        for future in pending:
+            if future.done() and not future.cancelled():
+                future.exception()
+            future.cancel()
+        pool.shutdown(wait=False)
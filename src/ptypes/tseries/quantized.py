@@ -0,0 +1,195 @@
+import attr
+import numpy as np  # type: ignore
+
+from ptypes.metadata import Metadata
+from .tseries import TimeSeries
+from .lazy import LazyTimeSeries
+from .formats import qtsread, qtswrite
+from typing import Type, TypeVar, Optional
+
+
+Q = TypeVar("Q", bound="QuantizedTimeSeries")
+
+
+codetypes = {
+    "int8": np.int8,
+    "int16": np.int16,
+    "float16": np.float16,
+}
+
+
+@attr.s(auto_attribs=True)
+class QuantizedTimeSeries(object):
+
+    """"""
+
+    codes: np.ndarray
+    scales: np.ndarray
+    offsets: np.ndarray
+    block: int
+    tsamp: float
+    meta: Metadata = attr.Factory(lambda: Metadata({}))
+
+    @property
+    def nsamp(self) -> int:
+        return self.codes.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes + self.offsets.nbytes
+
+    @classmethod
+    def quantize(
+        cls: Type[Q],
+        tseries: TimeSeries,
+        dtype: str = "int8",
+        block: int = 4096,
+    ) -> Q:
+
+        """"""
+
+        try:
+            codetype = codetypes[dtype]
+        except KeyError:
+            raise ValueError("Cannot quantize to {}.".format(dtype))
+
+        data = tseries.data
+        nsamp = data.size
+        nblocks = -(-nsamp // block)
+
+        codes = np.empty(nsamp, dtype=codetype)
+        scales = np.ones(nblocks, dtype=np.float32)
+        offsets = np.zeros(nblocks, dtype=np.float32)
+
+        if codetype is np.float16:
+            info = None
+            span = 2.0 * 6e4
+        else:
+            info = np.iinfo(codetype)
+            span = float(info.max) - float(info.min)
+        step = block * 256
+
+        for start in range(0, nsamp, step):
+            x = np.asarray(data[start : start + step], dtype=np.float32)
+            n = x.size
+            nb = -(-n // block)
+            if n % block:
+                x = np.concatenate((x, np.repeat(x[-1], nb * block - n)))
+            x = x.reshape(nb, block)
+
+            lo = x.min(axis=1)
+            hi = x.max(axis=1)
+
+            if info is None:
+                # NOTE: float16 only has about three significant digits, so
+                # each block is stored relative to its midrange. The scale
+                # stays at one unless the block would overflow float16.
+                offset = (0.5 * (lo + hi)).astype(np.float32)
+                scale = np.maximum((hi - lo) / span, 1.0).astype(np.float32)
+                q = x - offset[:, None]
+                q /= scale[:, None]
+            else:
+                exact = np.all(x == np.rint(x), axis=1) & (hi - lo <= span)
+                scale = np.where(hi > lo, (hi - lo) / span, 1.0)
+                scale = np.where(exact, 1.0, scale).astype(np.float32)
+                offset = (lo - info.min * scale).astype(np.float32)
+
+                q = x - offset[:, None]
+                q /= scale[:, None]
+                np.rint(q, out=q)
+                np.clip(q, info.min, info.max, out=q)
+
+            b = start // block
+            codes[start : start + n] = q.ravel()[:n]
+            scales[b : b + nb] = scale
+            offsets[b : b + nb] = offset
+
+        return cls(
+            codes,
+            scales=scales,
+            offsets=offsets,
+            block=block,
+            tsamp=tseries.tsamp,
+            meta=Metadata(tseries.meta),
+        )
+
+    def samples(
+        self,
+        start: int,
+        stop: int,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+
+        """"""
+
+        start = max(start, 0)
+        stop = min(stop, self.nsamp)
+
+        if out is None:
+            out = np.empty(max(stop - start, 0), dtype=np.float32)
+
+        b0 = start // self.block
+        b1 = -(-stop // self.block)
+        skip = start - b0 * self.block
+        scales = np.repeat(self.scales[b0:b1], self.block)[skip : skip + out.size]
+        offsets = np.repeat(self.offsets[b0:b1], self.block)[skip : skip + out.size]
+
+        np.multiply(self.codes[start:stop], scales, out=out)
+        out += offsets
+        return out
+
+    def dequantize(
+        self,
+        out: Optional[np.ndarray] = None,
+    ) -> TimeSeries:
+
+        """"""
+
+        return TimeSeries(
+            self.samples(0, self.nsamp, out=out),
+            self.tsamp,
+            meta=Metadata(self.meta),
+        )
+
+    def lazy(self) -> LazyTimeSeries:
+
+        """"""
+
+        return LazyTimeSeries(self)
+
+    @classmethod
+    def fromqts(
+        cls: Type[Q],
+        f: str,
+        mmap: bool = False,
+    ) -> Q:
+
+        """"""
+
+        meta, codes, scales, offsets, block = qtsread(f, mmap=mmap)
+        return cls(
+            codes,
+            scales=scales,
+            offsets=offsets,
+            block=block,
+            tsamp=meta["tsamp"],
+            meta=meta,
+        )
+
+    def toqts(
+        self,
+        f: str,
+    ) -> None:
+
+        """"""
+
+        meta = self.meta.todict()
+        meta["tsamp"] = self.tsamp
+        qtswrite(
+            self.codes,
+            self.scales,
+            self.offsets,
+            self.block,
+            Metadata.fromdict(meta),
+            f,
+        )
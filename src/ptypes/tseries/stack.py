@@ -0,0 +1,337 @@
+import attr
+import numpy as np  # type: ignore
+
+from pathlib import Path
+from ptypes.fourier import FourierStack
+from ptypes.metadata import Metadata
+from .tseries import TimeSeries
+from . import kernels
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Type, List, Union, TypeVar, Optional, Sequence
+
+
+S = TypeVar("S", bound="TimeSeriesStack")
+
+
+@attr.s(auto_attribs=True)
+class TimeSeriesStack(object):
+
+    """"""
+
+    data: np.ndarray
+    tsamp: float
+    dms: np.ndarray
+    metas: List[Metadata] = attr.Factory(list)
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __getitem__(self, i: int) -> TimeSeries:
+        meta = self.metas[i] if self.metas else Metadata({})
+        return TimeSeries(
+            self.data[i],
+            tsamp=self.tsamp,
+            meta=meta,
+        )
+
+    @property
+    def ntrials(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def nsamp(self) -> int:
+        return self.data.shape[1]
+
+    def _new(
+        self: S,
+        data: np.ndarray,
+        tsamp: Optional[float] = None,
+    ) -> S:
+
+        """"""
+
+        return type(self)(
+            data,
+            tsamp=self.tsamp if tsamp is None else tsamp,
+            dms=self.dms,
+            metas=self.metas,
+        )
+
+    def normalise(
+        self: S,
+        inplace: bool = False,
+    ) -> Any:
+
+        """"""
+
+        m = self.data.mean(axis=1, dtype=np.float64)
+        s = self.data.std(axis=1, dtype=np.float64)
+
+        data = self.data if inplace else self.data.copy()
+        data -= m[:, None].astype(data.dtype)
+        data /= s[:, None].astype(data.dtype)
+
+        if inplace:
+            return None
+        else:
+            return self._new(data)
+
+    def deredden(
+        self: S,
+        width: float,
+        inplace: bool = False,
+        minpts: int = 10,
+        method: str = "blockmedian",
+    ) -> Any:
+
+        """"""
+
+        widsamps = int(round(width / self.tsamp))
+        if method in ("blockmedian", "fourier"):
+            baseline = kernels.baseline(self.data, widsamps, minpts, method)
+        else:
+            baseline = np.empty(self.data.shape, dtype=np.float32)
+            for row, data in zip(baseline, self.data):
+                row[:] = kernels.baseline(data, widsamps, minpts, method)
+
+        if inplace:
+            self.data -= baseline
+            return None
+        else:
+            baseline -= self.data
+            np.negative(baseline, out=baseline)
+            return self._new(baseline)
+
+    def downsample(
+        self: S,
+        factor: int,
+        inplace: bool = False,
+    ) -> Any:
+
+        """"""
+
+        factor = int(factor)
+        nout = self.nsamp // factor
+
+        data = self.data[:, : nout * factor]
+        data = data.reshape(self.ntrials, nout, factor)
+        data = data.sum(axis=2, dtype=self.data.dtype)
+        tsamp = self.tsamp * factor
+
+        if inplace:
+            self.data = data
+            self.tsamp = tsamp
+            return None
+        else:
+            return self._new(data, tsamp=tsamp)
+
+    def fft(
+        self,
+        workers: Optional[int] = None,
+        pad: Union[str, int, None] = "fast",
+        out: Optional[np.ndarray] = None,
+    ) -> FourierStack:
+
+        """"""
+
+        if pad == "fast":
+            n = kernels.fastlen(self.nsamp)
+        elif pad == "trim":
+            n = kernels.fastlen(self.nsamp, up=False)
+        elif pad is None:
+            n = self.nsamp
+        elif isinstance(pad, (int, np.integer)) and pad > 0:
+            n = int(pad)
+        else:
+            raise ValueError("Unknown padding: {}".format(pad))
+
+        data = kernels.rfft(self.data, n, workers=workers, out=out)
+
+        metas = []
+        for meta in self.metas:
+            meta = meta.todict()
+            if "nsamp" in meta:
+                meta["nsamp"] = n
+            metas.append(Metadata.fromdict(meta))
+
+        return FourierStack(
+            data,
+            nsamp=n,
+            tsamp=self.tsamp,
+            dms=self.dms,
+            metas=metas,
+        )
+
+    @classmethod
+    def generate(
+        cls: Type[S],
+        length: float,
+        tsamp: float,
+        periods: Sequence[float],
+        phi0: Union[float, Sequence[float]] = 0.5,
+        ducy: Union[float, Sequence[float]] = 0.02,
+        amp: Union[float, Sequence[float]] = 10.0,
+        stdnoise: float = 1.0,
+        seeds: Optional[Sequence[int]] = None,
+        base: Optional[Union[np.ndarray, TimeSeries, "TimeSeriesStack"]] = None,
+        processes: Optional[int] = None,
+    ) -> S:
+
+        """"""
+
+        periods = np.atleast_1d(np.asarray(periods, dtype=np.float64))
+        ntrials = periods.size
+
+        phi0s, ducys, amps = [
+            np.broadcast_to(np.asarray(p, dtype=np.float64), (ntrials,))
+            for p in (phi0, ducy, amp)
+        ]
+
+        if seeds is None:
+            seeds = np.random.SeedSequence().generate_state(ntrials)
+        seeds = np.asarray(seeds, dtype=np.uint64)
+        if seeds.shape != (ntrials,):
+            raise ValueError("Need one seed per trial.")
+
+        if isinstance(base, (TimeSeries, TimeSeriesStack)):
+            base = base.data
+        if base is None:
+            nsamp = int(round(length / tsamp))
+        else:
+            base = np.asarray(base)
+            nsamp = base.shape[-1]
+            if base.ndim == 2 and base.shape[0] != ntrials:
+                raise ValueError("Need one base time series per trial.")
+
+        nproc = processes or 1
+        bounds = np.linspace(0, ntrials, nproc + 1).astype(int)
+        jobs = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            block = base
+            if base is not None and base.ndim == 2:
+                block = base[lo:hi]
+            jobs.append(
+                (
+                    nsamp,
+                    periods[lo:hi] / tsamp,
+                    phi0s[lo:hi],
+                    ducys[lo:hi],
+                    amps[lo:hi],
+                    seeds[lo:hi],
+                    stdnoise,
+                    block,
+                )
+            )
+
+        if processes:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                blocks = list(pool.map(kernels.injectblock, *zip(*jobs)))
+        else:
+            blocks = [kernels.injectblock(*job) for job in jobs]
+
+        data = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+        metas = [
+            Metadata(
+                {
+                    "source_name": "fake",
+                    "signal_shape": "Von Mises",
+                    "signal_period": period,
+                    "signal_initial_phase": p,
+                    "signal_duty_cycle": d,
+                    "signal_amplitude": a,
+                    "seed": int(seed),
+                }
+            )
+            for period, p, d, a, seed in zip(periods, phi0s, ducys, amps, seeds)
+        ]
+
+        return cls(
+            data,
+            tsamp=tsamp,
+            dms=np.zeros(ntrials),
+            metas=metas,
+        )
+
+    @classmethod
+    def fromnpy(
+        cls: Type[S],
+        array: np.ndarray,
+        tsamp: float,
+        dms: Optional[Sequence[float]] = None,
+    ) -> S:
+
+        """"""
+
+        if array.ndim != 2:
+            errmsg = "Initialising array must be two-dimensional! Exiting!"
+            raise ValueError(errmsg)
+
+        if dms is None:
+            dms = np.zeros(array.shape[0])
+
+        return cls(
+            array,
+            tsamp=tsamp,
+            dms=np.asarray(dms, dtype=np.float64),
+        )
+
+    @classmethod
+    def fromtseries(
+        cls: Type[S],
+        tseries: Sequence[TimeSeries],
+    ) -> S:
+
+        """"""
+
+        tsamps = {t.tsamp for t in tseries}
+        if len(tsamps) != 1:
+            raise ValueError("All time series must share the same tsamp.")
+
+        nsamp = min(t.data.size for t in tseries)
+        data = np.empty((len(tseries), nsamp), dtype=np.float32)
+        for row, t in zip(data, tseries):
+            row[:] = t.data[:nsamp]
+
+        metas = [t.meta for t in tseries]
+        return cls(
+            data,
+            tsamp=tsamps.pop(),
+            dms=np.array([m.get("dm", 0.0) for m in metas]),
+            metas=metas,
+        )
+
+    @classmethod
+    def fromdats(
+        cls: Type[S],
+        fs: Sequence[str],
+    ) -> S:
+
+        """"""
+
+        metas = []
+        for f in fs:
+            inf = Path(f).with_suffix(".inf")
+            if not inf.exists():
+                msg = "No corresponding *.inf file found. Exiting..."
+                raise FileNotFoundError(msg)
+            metas.append(Metadata.frominf(str(inf)))
+
+        tsamps = {m["tsamp"] for m in metas}
+        nsamps = {m["nsamp"] for m in metas}
+        if len(tsamps) != 1 or len(nsamps) != 1:
+            raise ValueError("All time series must share tsamp and nsamp.")
+
+        data = np.empty((len(fs), nsamps.pop()), dtype=np.float32)
+        for row, f in zip(data, fs):
+            with open(f, "rb") as fobj:
+                nread = fobj.readinto(memoryview(row).cast("B"))
+            if nread != row.nbytes:
+                raise ValueError("File is shorter than its *.inf: {}".format(f))
+
+        return cls(
+            data,
+            tsamp=tsamps.pop(),
+            dms=np.array([m.get("dm", 0.0) for m in metas]),
+            metas=metas,
+        )
@@ -0,0 +1,192 @@
+import json
+import attr
+import numpy as np  # type: ignore
+
+from pathlib import Path
+from ptypes.metadata import Metadata
+from .tseries import TimeSeries
+from .stack import TimeSeriesStack
+from .formats.qts import jsonable
+from typing import Any, Dict, List, Type, TypeVar, Optional, Sequence
+
+
+S = TypeVar("S", bound="TimeSeriesStore")
+
+
+@attr.s(auto_attribs=True)
+class TimeSeriesStore(object):
+
+    """"""
+
+    path: Path
+    tsamp: float
+    shard: int = 1 << 20
+    series: Dict[str, Dict[str, Any]] = attr.Factory(dict)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.series)
+
+    def __len__(self) -> int:
+        return len(self.series)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.series
+
+    @classmethod
+    def create(
+        cls: Type[S],
+        path: str,
+        tsamp: float,
+        shard: int = 1 << 20,
+    ) -> S:
+
+        """"""
+
+        store = cls(Path(path), tsamp=tsamp, shard=shard)
+        store.path.mkdir(parents=True, exist_ok=True)
+        store._flush()
+        return store
+
+    @classmethod
+    def open(
+        cls: Type[S],
+        path: str,
+    ) -> S:
+
+        """"""
+
+        path = Path(path)
+        with open(path.joinpath("index.json"), "r") as fobj:
+            index = json.load(fobj)
+
+        return cls(
+            path,
+            tsamp=index["tsamp"],
+            shard=index["shard"],
+            series=index["series"],
+        )
+
+    def _flush(self) -> None:
+
+        """"""
+
+        index = {
+            "tsamp": self.tsamp,
+            "shard": self.shard,
+            "series": self.series,
+        }
+
+        with open(self.path.joinpath("index.json"), "w+") as fobj:
+            json.dump(index, fobj, default=jsonable, indent=4)
+
+    def add(
+        self,
+        name: str,
+        tseries: TimeSeries,
+    ) -> None:
+
+        """"""
+
+        if not np.isclose(tseries.tsamp, self.tsamp):
+            raise ValueError("Time series does not match the store's tsamp.")
+
+        folder = self.path.joinpath(name)
+        folder.mkdir(exist_ok=True)
+
+        data = tseries.data
+        nshards = -(-data.size // self.shard)
+        for i in range(nshards):
+            shard = data[i * self.shard : (i + 1) * self.shard]
+            np.save(folder.joinpath("{:06d}.npy".format(i)), shard)
+
+        self.series[name] = {
+            "nsamp": int(data.size),
+            "nshards": nshards,
+            "meta": tseries.meta.todict(),
+        }
+        self._flush()
+
+    def load(
+        self,
+        name: str,
+        start: int = 0,
+        stop: Optional[int] = None,
+    ) -> TimeSeries:
+
+        """"""
+
+        try:
+            entry = self.series[name]
+        except KeyError:
+            raise KeyError("No series named {} in the store.".format(name))
+
+        nsamp = entry["nsamp"]
+        stop = nsamp if stop is None else min(stop, nsamp)
+        start = min(max(start, 0), stop)
+
+        data = self._read(name, start, stop)
+
+        meta = dict(entry["meta"])
+        if "nsamp" in meta:
+            meta["nsamp"] = stop - start
+
+        return TimeSeries(
+            data,
+            self.tsamp,
+            meta=Metadata.fromdict(meta),
+        )
+
+    def _read(
+        self,
+        name: str,
+        start: int,
+        stop: int,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+
+        """"""
+
+        folder = self.path.joinpath(name)
+
+        if out is None:
+            out = np.empty(stop - start, dtype=np.float32)
+
+        first = start // self.shard
+        last = -(-stop // self.shard)
+        for i in range(first, last):
+            lo = max(start, i * self.shard)
+            hi = min(stop, (i + 1) * self.shard)
+            shard = np.load(
+                folder.joinpath("{:06d}.npy".format(i)),
+                mmap_mode="r",
+            )
+            offset = i * self.shard
+            out[lo - start : hi - start] = shard[lo - offset : hi - offset]
+
+        return out
+
+    def window(
+        self,
+        names: Sequence[str],
+        start: int,
+        stop: int,
+    ) -> TimeSeriesStack:
+
+        """"""
+
+        nsamp = min(self.series[name]["nsamp"] for name in names)
+        stop = min(stop, nsamp)
+        start = min(max(start, 0), stop)
+
+        data = np.empty((len(names), stop - start), dtype=np.float32)
+        for row, name in zip(data, names):
+            self._read(name, start, stop, out=row)
+
+        metas = [Metadata.fromdict(self.series[name]["meta"]) for name in names]
+        return TimeSeriesStack(
+            data,
+            tsamp=self.tsamp,
+            dms=np.array([m.get("dm", 0.0) for m in metas], dtype=np.float64),
+            metas=metas,
+        )
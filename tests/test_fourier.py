@@ -0,0 +1,456 @@
+import shutil
+import tempfile
+import warnings
+import numpy as np  # type: ignore
+
+from pathlib import Path
+from pytest import raises  # type: ignore
+from ptypes.fourier import (  # type: ignore
+    Fourier,
+    FourierStack,
+    FrequencyAxis,
+    AccelSearch,
+    kernels,
+)
+
+
+datadir = Path(__file__).parent.joinpath("data")
+
+
+class TestLazy(object):
+
+    """"""
+
+    nsamp = 64
+    tsamp = 1e-3
+
+    def make_fourier(self) -> Fourier:
+
+        """"""
+
+        rng = np.random.default_rng(42)
+        data = np.fft.rfft(rng.normal(size=self.nsamp)).astype(np.complex64)
+        return Fourier.fromnpy(data, self.nsamp, self.tsamp)
+
+    def test_freq(self) -> None:
+
+        """"""
+
+        f = self.make_fourier()
+        assert isinstance(f.freq, FrequencyAxis)
+        assert len(f.freq) == f.data.size
+        assert np.allclose(np.asarray(f.freq), np.fft.rfftfreq(self.nsamp, self.tsamp))
+        assert f.freq[-1] == f.freq[f.data.size - 1]
+        assert f.freq.index(f.freq[10]) == 10
+        with raises(IndexError):
+            f.freq[f.data.size]
+
+    def test_cached(self) -> None:
+
+        """"""
+
+        f = self.make_fourier()
+        assert f._pows is None
+        assert np.allclose(f.pows, np.abs(f.data) ** 2)
+        assert f.pows is f.pows
+        assert np.allclose(f.phas, np.angle(f.data))
+
+    def test_invalidate(self) -> None:
+
+        """"""
+
+        f = self.make_fourier()
+        pows = f.pows
+        f.data[1] = 0
+        f.invalidate()
+        assert f.pows is not pows
+        assert f.pows[1] == 0
+
+        f.data = f.data * 2
+        assert f._pows is None
+        assert np.allclose(f.pows, np.abs(f.data) ** 2)
+
+
+class TestFFT(object):
+
+    """"""
+
+    def test_read(self) -> None:
+
+        """"""
+
+        rng = np.random.default_rng(42)
+        spec = (rng.normal(size=64) + 1j * rng.normal(size=64)).astype(np.complex64)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            fft = Path(tmp).joinpath("test.fft")
+            inf = datadir.joinpath("test_fake_presto_radio.inf")
+            shutil.copy(inf, fft.with_suffix(".inf"))
+            spec.tofile(fft)
+
+            for mmap in [False, True]:
+                f = Fourier.fromfft(fft, mmap=mmap)
+                assert f.data.dtype == np.complex64
+                assert isinstance(f.data, np.memmap) == mmap
+                assert np.array_equal(f.data, spec)
+
+            f = Fourier.fromfft(fft, mmap=True)
+            blocks = list(f.iterbins(10, 50, chunk=16))
+            assert [i for i, _ in blocks] == [10, 26, 42]
+            assert np.array_equal(np.concatenate([b for _, b in blocks]), spec[10:50])
+            assert all(np.shares_memory(b, f.data) for _, b in blocks)
+
+
+class TestHarmonics(object):
+
+    """"""
+
+    def test_sum(self) -> None:
+
+        """"""
+
+        rng = np.random.default_rng(1)
+        nbins = 4097
+        data = (rng.normal(size=nbins) + 1j * rng.normal(size=nbins)) / np.sqrt(2)
+        data[100 * np.arange(1, 33)] += 3.0
+        f = Fourier.fromnpy(data.astype(np.complex64), nsamp=8192, tsamp=1e-3)
+
+        peaks = f.harmonic_sum(k=5)
+        assert sorted(peaks) == [1, 2, 4, 8, 16, 32]
+        for nharm, (bins, vals) in peaks.items():
+            assert bins.size == vals.size == 5
+            assert np.all(np.diff(vals) <= 0)
+            direct = f.pows[bins[0] * np.arange(1, nharm + 1)].sum()
+            assert np.isclose(vals[0], direct, rtol=1e-5)
+        assert peaks[32][0][0] == 100
+        assert peaks[32][1][0] > peaks[1][1][0]
+
+    def test_bad(self) -> None:
+
+        """"""
+
+        f = Fourier.fromnpy(np.ones(16, dtype=np.complex64), nsamp=30, tsamp=1.0)
+        with raises(ValueError):
+            f.harmonic_sum(nharms=[0, 1])
+
+
+class TestClean(object):
+
+    """"""
+
+    def spectrum(self, nbins: int = 20001) -> Fourier:
+
+        """"""
+
+        rng = np.random.default_rng(5)
+        red = 1.0 + 50.0 / (1.0 + np.arange(nbins) / 20.0)
+        data = rng.normal(size=nbins) + 1j * rng.normal(size=nbins)
+        data *= np.sqrt(red / 2.0)
+        return Fourier.fromnpy(data.astype(np.complex64), nsamp=40000, tsamp=1e-3)
+
+    def test_whiten(self) -> None:
+
+        """"""
+
+        f = self.spectrum()
+        w = f.whiten()
+        assert w.data is not f.data
+        assert w.data[0] == 1.0
+        assert np.isclose(w.pows[1:1000].mean(), 1.0, atol=0.15)
+        assert np.isclose(w.pows[10000:].mean(), 1.0, atol=0.05)
+
+        pows = f.pows
+        assert f.whiten(inplace=True) is None
+        assert f.pows is not pows
+        assert np.allclose(f.data, w.data)
+
+        with raises(ValueError):
+            f.whiten(method="runmed")
+        for startwidth, endwidth in [(0, 100), (6, 0), (20, 10)]:
+            with raises(ValueError):
+                f.whiten(startwidth=startwidth, endwidth=endwidth)
+
+    def test_zap(self) -> None:
+
+        """"""
+
+        f = self.spectrum(1001)
+        df = f.freq.step
+        z = f.zap([(100 * df, 2 * df, 3), (700 * df, 0.0, 1)])
+        zeroed = np.flatnonzero(z.data == 0)
+        expect = [99, 100, 101, 199, 200, 201, 299, 300, 301, 700]
+        assert zeroed.tolist() == expect
+        assert np.count_nonzero(f.data == 0) == 0
+
+        z = f.zap([(100 * df, 2 * df, 3)], grow=True)
+        assert np.count_nonzero(z.data == 0) == 3 + 5 + 7
+        assert np.array_equal(f.zap([]).data, f.data)
+
+    def test_mmap(self) -> None:
+
+        """"""
+
+        f = self.spectrum(5000)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            fft = Path(tmp).joinpath("test.fft")
+            inf = datadir.joinpath("test_fake_presto_radio.inf")
+            shutil.copy(inf, fft.with_suffix(".inf"))
+            f.data.tofile(fft)
+
+            expect = Fourier.fromfft(fft).whiten().zap([(10.0, 1.0, 2)]).data
+
+            m = Fourier.fromfft(fft, mmap=True, mode="r+")
+            m.whiten(inplace=True)
+            m.zap([(10.0, 1.0, 2)], inplace=True)
+            assert isinstance(m.data, np.memmap)
+            m.data.flush()
+            assert np.allclose(np.fromfile(fft, dtype=np.complex64), expect)
+
+            r = Fourier.fromfft(fft, mmap=True)
+            r.whiten(inplace=True)
+            assert not isinstance(r.data, np.memmap)
+
+
+class TestCandidates(object):
+
+    """"""
+
+    def test_sigma(self) -> None:
+
+        """"""
+
+        # NOTE: Reference values are norm.isf(chi2.sf(2 * P, 2 * n)) in scipy.
+        pows = np.array([1.0, 10.0, 30.0, 100.0])
+        assert np.allclose(
+            kernels.sigma(pows, 1),
+            [0.3375, 3.9139, 7.3577, 13.8885],
+            atol=1e-3,
+        )
+        assert np.allclose(
+            kernels.sigma(pows, 8),
+            [-4.2594, 0.7714, 4.8826, 12.0666],
+            atol=1e-3,
+        )
+        assert np.isfinite(kernels.sigma(np.array([1e5]), 32)).all()
+
+        # NOTE: Far below the median the survival function rounds to one.
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            low = kernels.sigma(np.array([1.0, 1e-3, 0.0]), 32)
+        assert np.all(np.isfinite(low))
+        assert np.isclose(low[0], -12.575, atol=1e-2)
+        assert np.all(np.diff(low) < 0)
+
+    def test_peaks(self) -> None:
+
+        """"""
+
+        pows = np.full(300001, 0.5, dtype=np.float32)
+        pows[[5000, 5001, 5002]] = [30.0, 50.0, 30.0]
+        pows[[200000, 250000]] = [25.0, 60.0]
+        pows = np.concatenate((pows, np.full(1 << 20, 0.5, dtype=np.float32)))
+        pows[(1 << 20) - 1 : (1 << 20) + 1] = [40.0, 45.0]
+
+        bins, vals = kernels.peaks(pows, 20.0, k=3)
+        assert bins.tolist() == [250000, 5001, 1 << 20]
+        assert vals.tolist() == [60.0, 50.0, 45.0]
+
+        bins, vals = kernels.peaks(pows, 20.0, k=10)
+        assert bins.tolist() == [250000, 5001, 1 << 20, 200000]
+        assert kernels.peaks(pows, 100.0, k=10)[0].size == 0
+        bins, vals = kernels.peaks(pows, 20.0, k=0)
+        assert bins.size == vals.size == 0
+        assert vals.dtype == np.float32
+
+    def test_candidates(self) -> None:
+
+        """"""
+
+        data = np.full(4097, np.sqrt(0.5), dtype=np.complex64)
+        data[100 * np.arange(1, 5)] = 3.0
+        data[1000] = 5.0
+        f = Fourier.fromnpy(data, nsamp=8192, tsamp=1e-3)
+
+        cands = f.candidates(20.0, k=5)
+        assert cands["bin"].tolist() == [1000]
+        assert np.isclose(cands["freq"][0], 1000 / 8.192)
+        assert np.isclose(cands["sigma"][0], kernels.sigma(np.array([25.0]), 1)[0])
+
+        cands = f.candidates(20.0, k=5, nharm=4)
+        assert sorted(cands["bin"].tolist()) == [100, 250, 500, 1000]
+        assert cands["power"].tolist() == [36.0, 26.5, 26.5, 26.5]
+        assert np.all(cands["nharm"] == 4)
+        assert f.candidates(20.0, k=0).size == 0
+
+
+class TestInterpolate(object):
+
+    """"""
+
+    nsamp = 8192
+
+    def spectrum(self, r: float) -> Fourier:
+
+        """"""
+
+        t = np.arange(self.nsamp)
+        data = np.cos(2 * np.pi * r * t / self.nsamp).astype(np.float32)
+        return Fourier.fromnpy(
+            np.fft.rfft(data).astype(np.complex64),
+            nsamp=self.nsamp,
+            tsamp=1e-3,
+        )
+
+    def test_interbin(self) -> None:
+
+        """"""
+
+        f = self.spectrum(1000.5)
+        i = f.interbin()
+        assert i.data.size == 2 * f.data.size - 1
+        assert np.array_equal(i.data[::2], f.data)
+        assert np.isclose(i.freq.step, 0.5 * f.freq.step)
+        assert i.pows.argmax() == 2001
+        assert i.pows.max() > 1.5 * f.pows.max()
+        assert np.isclose(np.sqrt(i.pows.max()), self.nsamp / 2, rtol=0.1)
+
+    def test_interpolate(self) -> None:
+
+        """"""
+
+        f = self.spectrum(1000.3)
+        amps = f.interpolate([1000.3, 1000.0, 2500.0])
+        assert amps.shape == (3,)
+        assert np.isclose(np.abs(amps[0]), self.nsamp / 2, rtol=0.01)
+        assert np.isclose(amps[1], f.data[1000], rtol=1e-5)
+        assert np.abs(amps[2]) < 1e-2 * np.abs(amps[0])
+
+        grid = f.interpolate(np.linspace(999.0, 1001.0, 201).reshape(3, 67))
+        assert grid.shape == (3, 67)
+        assert np.isclose(np.abs(f.interpolate(0.0)), np.abs(f.data[0]))
+
+
+class TestAccel(object):
+
+    """"""
+
+    nsamp = 1 << 16
+
+    def spectrum(self, r: float, z: float, amp: float) -> Fourier:
+
+        """"""
+
+        rng = np.random.default_rng(0)
+        t = np.arange(self.nsamp) / self.nsamp
+        phase = (r - 0.5 * z) * t + 0.5 * z * t * t
+        data = rng.normal(size=self.nsamp) + amp * np.cos(2 * np.pi * phase)
+        spec = np.fft.rfft(data) / np.sqrt(self.nsamp)
+        return Fourier.fromnpy(
+            spec.astype(np.complex64),
+            nsamp=self.nsamp,
+            tsamp=1e-3,
+        )
+
+    def test_response(self) -> None:
+
+        """"""
+
+        resp = kernels.response(0.0, 2, 16)
+        assert resp.size == 2 * 2 * 8 + 1
+        assert np.isclose(resp[16], 1.0)
+        assert np.allclose(resp[::2][np.arange(17) != 8], 0.0, atol=1e-5)
+        assert kernels.response(30.0, 2, 16) is kernels.response(30.0, 2, 16)
+
+        resp = kernels.response(30.0, 2, 16)
+        assert np.isclose(np.sum(np.abs(resp[::2]) ** 2), 1.0)
+
+    def test_plane(self) -> None:
+
+        """"""
+
+        f = self.spectrum(5000.0, 0.0, 0.0)
+        a = AccelSearch(f, zmax=20, fftlen=4096)
+        assert a.zs.tolist() == list(range(-20, 21, 2))
+
+        start = 0.0
+        for r, plane in a.planes(stop=2000):
+            assert r == start
+            assert plane.shape[0] == a.zs.size
+            n = plane.shape[1] // 2
+            zero = plane[a.zs.size // 2, ::2]
+            assert np.allclose(zero, f.pows[int(r) : int(r) + n], atol=1e-4)
+            start += plane.shape[1] / 2
+        assert start == 2000
+        assert a.templates() is a.templates()
+
+    def test_search(self) -> None:
+
+        """"""
+
+        f = self.spectrum(5000.3, 27.0, 0.2)
+        found = f.accelsearch(zmax=40, threshold=20.0, k=3, zmaxes=[0, 40], workers=2)
+        assert sorted(found) == [0, 40]
+
+        best = found[40][0]
+        assert abs(best["r"] - 5000.3) <= 0.5
+        assert abs(best["z"] - 27.0) <= 2.0
+        assert np.isclose(best["freq"], best["r"] / (self.nsamp * 1e-3))
+        assert best["power"] > 5 * found[0]["power"].max()
+        assert best["sigma"] > 20
+
+
+class TestStack(object):
+
+    """"""
+
+    def stack(self) -> FourierStack:
+
+        """"""
+
+        rng = np.random.default_rng(3)
+        nbins = 5001
+        fouriers = []
+        for i in range(4):
+            red = 1.0 + 20.0 / (1.0 + np.arange(nbins) / 10.0)
+            data = rng.normal(size=nbins) + 1j * rng.normal(size=nbins)
+            data *= np.sqrt(red / 2.0)
+            data[250 * (i + 1) * np.arange(1, 5)] += 4.0 * np.sqrt(red[250])
+            fouriers.append(
+                Fourier.fromnpy(data.astype(np.complex64), nsamp=10000, tsamp=1e-3)
+            )
+        return FourierStack.fromfourier(fouriers, dms=[0.0, 10.0, 20.0, 30.0])
+
+    def test_batched(self) -> None:
+
+        """"""
+
+        s = self.stack()
+        assert len(s) == s.ntrials == 4
+        assert s.nbins == 5001
+        assert np.isclose(s.freq.step, 0.1)
+
+        w = s.whiten()
+        for i in range(4):
+            assert np.allclose(w.data[i], s[i].whiten().data, atol=1e-5)
+        with raises(ValueError):
+            s.whiten(startwidth=0)
+
+        birdies = [(25.0, 0.3, 2)]
+        z = w.zap(birdies)
+        for i in range(4):
+            assert np.array_equal(z.data[i], w[i].zap(birdies).data)
+
+        peaks = w.harmonic_sum(nharms=[1, 4], k=2)
+        assert peaks[4][0].shape == (4, 2)
+        assert peaks[4][0][:, 0].tolist() == [250, 500, 750, 1000]
+
+        cands = w.candidates(30.0, k=1, nharm=4)
+        assert cands["trial"].tolist() == [0, 1, 2, 3]
+        assert cands["dm"].tolist() == [0.0, 10.0, 20.0, 30.0]
+        assert cands["bin"].tolist() == [250, 500, 750, 1000]
+        single = w[2].candidates(30.0, k=1, nharm=4)
+        assert np.isclose(cands["sigma"][2], single["sigma"][0])
+
+        assert s.whiten(inplace=True) is None
+        assert np.allclose(s.data, w.data)
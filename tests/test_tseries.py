@@ -1,9 +1,21 @@
+import asyncio
 import tempfile
 import numpy as np  # type: ignore
 
+from typing import Any
 from pathlib import Path
 from pytest import raises  # type: ignore
-from ptypes.tseries import TimeSeries  # type: ignore
+from ptypes.bits import unpack, unpackrange  # type: ignore
+from ptypes.metadata import Metadata  # type: ignore
+from ptypes.tseries import (  # type: ignore
+    TimeSeries,
+    TimeSeriesStack,
+    TimeSeriesStore,
+    TimeSeriesWriter,
+    QuantizedTimeSeries,
+    load_many,
+    aload_many,
+)
 
 
 datadir = Path(__file__).parent.joinpath("data")
@@ -48,6 +60,16 @@ class TestDat(object):
         t = TimeSeries.fromdat(f)
         self.check_data(t)
 
+    def test_mmap(self) -> None:
+
+        """"""
+
+        f = datadir.joinpath("test_fake_presto_radio.dat")
+        t = TimeSeries.fromdat(f, mmap=True)
+        assert isinstance(t.data, np.memmap)
+        assert not t.data.flags.writeable
+        self.check_data(t)
+
     def test_non_existent(self) -> None:
 
         """"""
@@ -95,6 +117,18 @@ class TestTim(object):
             assert t.data.dtype == np.float32
             assert np.allclose(t.data, self.refdata)
 
+    def test_mmap(self) -> None:
+
+        """"""
+
+        for fname in self.fnames:
+            f = datadir.joinpath(fname)
+            t = TimeSeries.fromtim(f, mmap=True)
+            assert t.tsamp == 64e-6
+            assert isinstance(t.data, np.memmap)
+            assert not t.data.flags.writeable
+            assert np.allclose(t.data, self.refdata)
+
     def test_write(self) -> None:
 
         """"""
@@ -110,6 +144,42 @@ class TestTim(object):
                 assert test.data.dtype == np.float32
                 assert np.allclose(test.data, self.refdata)
 
+    def test_lowbits(self) -> None:
+
+        """"""
+
+        f = datadir.joinpath("test_fake_sigproc_uint8.tim")
+        t = TimeSeries.fromtim(f)
+
+        for nbits in [1, 2, 4]:
+            with tempfile.NamedTemporaryFile(suffix=".tim") as obj:
+                tim = Path(obj.name)
+                data = self.refdata % (1 << nbits)
+                meta = t.meta.todict()
+                meta["nbits"] = nbits
+                TimeSeries(data, t.tsamp, meta=Metadata(meta)).totim(tim)
+                test = TimeSeries.fromtim(tim)
+                assert tim.stat().st_size == test.meta["size"] + 2 * nbits
+                assert test.data.dtype == np.float32
+                assert np.allclose(test.data, data)
+                test = TimeSeries.fromtim(tim, mmap=True)
+                assert np.allclose(test.data, data)
+                chunks = list(TimeSeries.iterchunks(tim, 5, overlap=2))
+                assert [c.data.size for c in chunks] == [5, 5, 5, 5, 4]
+                for i, c in enumerate(chunks):
+                    assert np.allclose(c.data, data[3 * i : 3 * i + 5])
+
+    def test_unpackrange(self) -> None:
+
+        """"""
+
+        raw = np.arange(256, dtype=np.uint8)
+        for nbits in [1, 2, 4]:
+            full = unpack(raw, nbits)
+            for start, stop in [(0, 1), (3, 17), (5, 6), (250, full.size)]:
+                part = unpackrange(raw, nbits, start, stop)
+                assert np.array_equal(part, full[start:stop])
+
 
 class TestMisc(object):
 
@@ -150,3 +220,919 @@ class TestMisc(object):
             self.refdata.astype(np.float32).tofile(f.name)
             t = TimeSeries.frombin(f.name, np.float32, self.tsamp)
             self.check_data(t)
+
+    def test_partial(self) -> None:
+
+        """"""
+
+        with tempfile.TemporaryDirectory() as tmp:
+            npy = Path(tmp).joinpath("test.npy")
+            raw = Path(tmp).joinpath("test.bin")
+            np.save(npy, self.refdata)
+            self.refdata.tofile(raw)
+
+            for mmap in [False, True]:
+                t = TimeSeries.fromnpyfile(npy, self.tsamp, 4, 8, mmap=mmap)
+                assert isinstance(t.data, np.memmap) == mmap
+                assert np.allclose(t.data, self.refdata[4:12])
+                t = TimeSeries.frombin(raw, np.float32, self.tsamp, 4, 8, mmap=mmap)
+                assert isinstance(t.data, np.memmap) == mmap
+                assert np.allclose(t.data, self.refdata[4:12])
+
+            t = TimeSeries.fromnpyfile(npy, self.tsamp, mmap=True)
+            assert isinstance(t.data, np.memmap)
+            self.check_data(t)
+
+
+class TestOps(object):
+
+    """"""
+
+    tsamp = 64e-6
+
+    def make_tseries(self) -> TimeSeries:
+
+        """"""
+
+        rng = np.random.default_rng(42)
+        data = rng.normal(5.0, 2.0, size=4096).astype(np.float32)
+        return TimeSeries(data, self.tsamp)
+
+    def test_normalise(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        n = t.normalise()
+        assert n.data.dtype == np.float32
+        assert np.isclose(n.data.mean(), 0.0, atol=1e-5)
+        assert np.isclose(n.data.std(), 1.0, atol=1e-5)
+
+        out = np.empty_like(t.data)
+        n = t.normalise(out=out)
+        assert n.data is out
+
+        data = t.data
+        t.normalise(inplace=True)
+        assert t.data is data
+        assert np.allclose(t.data, out)
+
+    def test_deredden(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        d = t.deredden(32 * self.tsamp)
+        assert d.data.dtype == np.float32
+        assert abs(np.median(d.data)) < 0.5
+
+        data = t.data
+        t.deredden(32 * self.tsamp, inplace=True)
+        assert t.data is data
+        assert np.allclose(t.data, d.data)
+
+    def test_deredden_methods(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        t.data += np.linspace(0, 20, t.data.size, dtype=np.float32)
+        width = 256 * self.tsamp
+
+        for method in ["runmed", "decimated", "blockmedian", "fourier"]:
+            d = t.deredden(width, method=method)
+            assert d.data.dtype == np.float32
+            assert abs(np.median(d.data[512:-512])) < 0.5
+
+        with raises(ValueError):
+            t.deredden(width, method="nonsense")
+
+    def test_normalise_mmap(self) -> None:
+
+        """"""
+
+        f = datadir.joinpath("test_fake_presto_radio.dat")
+        t = TimeSeries.fromdat(f, mmap=True)
+        n = t.normalise()
+        ref = np.arange(16)
+        assert n.data.dtype == np.float32
+        assert np.allclose(n.data, (ref - ref.mean()) / ref.std())
+
+        t.normalise(inplace=True)
+        assert not isinstance(t.data, np.memmap)
+        assert np.allclose(t.data, n.data)
+
+
+class TestCopy(object):
+
+    """"""
+
+    tsamp = 64e-6
+
+    def make_tseries(self) -> TimeSeries:
+
+        """"""
+
+        rng = np.random.default_rng(42)
+        data = rng.normal(5.0, 2.0, size=1024).astype(np.float32)
+        meta = Metadata({"tsamp": self.tsamp, "nsamp": 1024})
+        return TimeSeries(data, self.tsamp, meta=meta)
+
+    def test_shared(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        c = t.copy()
+        assert np.shares_memory(t.data, c.data)
+        assert c.meta == t.meta
+        assert c.meta is not t.meta
+
+    def test_write(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        ref = t.data.copy()
+        c = t.copy()
+        c.normalise(inplace=True)
+        assert not np.shares_memory(t.data, c.data)
+        assert np.allclose(t.data, ref)
+
+        t.normalise(inplace=True)
+        assert np.allclose(t.data, c.data)
+
+    def test_meta(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        n = t.normalise()
+        n.meta["nsamp"] = 0
+        assert t.meta["nsamp"] == 1024
+
+    def test_copy_flag(self) -> None:
+
+        """"""
+
+        data = np.arange(16, dtype=np.float32)
+        t = TimeSeries.fromnpy(data, self.tsamp, copy=True)
+        assert not np.shares_memory(t.data, data)
+        t = TimeSeries.fromnpy(data, self.tsamp)
+        assert t.data is data
+
+    def test_aliasing(self) -> None:
+
+        """"""
+
+        data = np.arange(16, dtype=np.float32)
+        t = TimeSeries.fromnpy(data, self.tsamp)
+        c = t.copy()
+        assert np.shares_memory(c.data, data)
+        assert not t.data.flags.writeable
+        data[0] = 1.0
+
+        s = TimeSeriesStack.fromnpy(np.zeros((2, 16), dtype=np.float32), self.tsamp)
+        c = s[0].copy()
+        s.data += 1.0
+        assert not c.data.any()
+        c.data[0] = 1.0
+
+
+class TestChunks(object):
+
+    """"""
+
+    refdata = np.arange(16)
+
+    fnames = [
+        "test_fake_presto_radio.dat",
+        "test_fake_sigproc_float32.tim",
+        "test_fake_sigproc_uint8.tim",
+    ]
+
+    def test_iterchunks(self) -> None:
+
+        """"""
+
+        for fname in self.fnames:
+            f = datadir.joinpath(fname)
+            chunks = list(TimeSeries.iterchunks(f, 6, overlap=2))
+            assert [c.data.size for c in chunks] == [6, 6, 6, 4]
+            for i, c in enumerate(chunks):
+                assert c.tsamp == 64e-6
+                assert c.data.dtype == np.float32
+                assert np.allclose(c.data, self.refdata[4 * i : 4 * i + 6])
+
+    def test_metadata(self) -> None:
+
+        """"""
+
+        f = datadir.joinpath("test_fake_presto_radio.dat")
+        chunks = list(TimeSeries.iterchunks(f, 8))
+        assert [c.meta["nsamp"] for c in chunks] == [8, 8]
+        assert chunks[0].meta["mjd"] == 59000.0
+        assert np.isclose(chunks[1].meta["mjd"], 59000.0 + 8 * 64e-6 / 86400.0)
+
+    def test_bad_overlap(self) -> None:
+
+        """"""
+
+        with raises(ValueError):
+            f = datadir.joinpath("test_fake_presto_radio.dat")
+            next(TimeSeries.iterchunks(f, 4, overlap=4))
+
+
+class TestWriter(object):
+
+    """"""
+
+    refdata = np.arange(16)
+
+    def test_dat(self) -> None:
+
+        """"""
+
+        with tempfile.TemporaryDirectory() as tmp:
+            dat = Path(tmp).joinpath("test.dat")
+            f = datadir.joinpath("test_fake_presto_radio.dat")
+            t = TimeSeries.fromdat(f)
+            with TimeSeriesWriter(dat, t.meta) as writer:
+                for chunk in TimeSeries.iterchunks(f, 5):
+                    writer.write(chunk)
+            test = TimeSeries.fromdat(dat)
+            assert test.meta["nsamp"] == 16
+            assert test.data.dtype == np.float32
+            assert np.allclose(test.data, self.refdata)
+
+    def test_tim(self) -> None:
+
+        """"""
+
+        f = datadir.joinpath("test_fake_sigproc_uint8.tim")
+        t = TimeSeries.fromtim(f)
+
+        for nbits in [2, 8, 32]:
+            with tempfile.TemporaryDirectory() as tmp:
+                tim = Path(tmp).joinpath("test.tim")
+                data = self.refdata % (1 << min(nbits, 8))
+                meta = t.meta.todict()
+                meta["nbits"] = nbits
+                with TimeSeriesWriter(tim, Metadata(meta)) as writer:
+                    for i in range(0, 16, 3):
+                        writer.write(data[i : i + 3])
+                test = TimeSeries.fromtim(tim)
+                assert test.meta["nsamples"] == 16
+                assert test.data.dtype == np.float32
+                assert np.allclose(test.data, data)
+
+
+class TestStack(object):
+
+    """"""
+
+    tsamp = 64e-6
+    refdata = np.arange(16, dtype=np.float32)
+
+    fnames = [
+        "test_fake_presto_radio.dat",
+        "test_fake_presto_radio_breaks.dat",
+        "test_fake_presto_xray.dat",
+    ]
+
+    def make_stack(self) -> TimeSeriesStack:
+
+        """"""
+
+        rng = np.random.default_rng(42)
+        data = rng.normal(size=(4, 1024)).astype(np.float32)
+        data += np.arange(4, dtype=np.float32)[:, None]
+        return TimeSeriesStack.fromnpy(data, self.tsamp, dms=[0, 1, 2, 3])
+
+    def test_fromdats(self) -> None:
+
+        """"""
+
+        fs = [datadir.joinpath(fname) for fname in self.fnames]
+        s = TimeSeriesStack.fromdats(fs)
+        assert len(s) == 3
+        assert s.tsamp == self.tsamp
+        assert s.data.shape == (3, 16)
+        assert np.allclose(s.data, self.refdata)
+        assert np.allclose(s.dms, [42.42, 42.42, 0.0])
+        assert np.allclose(s[1].data, self.refdata)
+
+    def test_normalise(self) -> None:
+
+        """"""
+
+        s = self.make_stack()
+        n = s.normalise()
+        assert n.data.dtype == np.float32
+        assert np.allclose(n.data.mean(axis=1), 0.0, atol=1e-5)
+        assert np.allclose(n.data.std(axis=1), 1.0, atol=1e-5)
+        s.normalise(inplace=True)
+        assert np.allclose(s.data, n.data)
+
+    def test_downsample(self) -> None:
+
+        """"""
+
+        s = self.make_stack()
+        d = s.downsample(4)
+        assert d.data.shape == (4, 256)
+        assert np.isclose(d.tsamp, 4 * self.tsamp)
+        assert np.allclose(d.data[:, 0], s.data[:, :4].sum(axis=1))
+
+    def test_deredden(self) -> None:
+
+        """"""
+
+        s = self.make_stack()
+        s.data += np.linspace(0, 10, s.nsamp, dtype=np.float32)
+        d = s.deredden(64 * self.tsamp)
+        assert d.data.dtype == np.float32
+        assert np.all(np.abs(d.data.mean(axis=1)) < 0.2)
+        s.deredden(64 * self.tsamp, inplace=True)
+        assert np.allclose(s.data, d.data)
+
+        s = self.make_stack()
+        s.data += np.linspace(0, 10, s.nsamp, dtype=np.float32)
+        for method in ["runmed", "decimated", "blockmedian", "fourier"]:
+            d = s.deredden(64 * self.tsamp, method=method)
+            for i in range(s.ntrials):
+                ref = s[i].deredden(64 * self.tsamp, method=method)
+                assert np.allclose(d.data[i], ref.data, atol=1e-5)
+
+        with raises(ValueError):
+            s.deredden(64 * self.tsamp, method="mean")
+
+
+class TestPyramid(object):
+
+    """"""
+
+    tsamp = 64e-6
+
+    def make_tseries(self) -> TimeSeries:
+
+        """"""
+
+        rng = np.random.default_rng(42)
+        data = rng.normal(size=4096).astype(np.float32)
+        return TimeSeries(data, self.tsamp)
+
+    def test_pyramid(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        levels = t.pyramid(4)
+        assert len(levels) == 4
+        for i, level in enumerate(levels, start=1):
+            ref = TimeSeries(t.data, self.tsamp).downsample(2 ** i)
+            assert np.isclose(level.tsamp, self.tsamp * 2 ** i)
+            assert np.allclose(level.data, ref.data, atol=1e-4)
+
+    def test_reuse(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        levels = t.pyramid(3)
+        assert t.downsample(8).data is levels[-1].data
+        d = t.downsample(24)
+        ref = TimeSeries(t.data, self.tsamp).downsample(24)
+        assert np.allclose(d.data, ref.data, atol=1e-4)
+
+    def test_eviction(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        t.cachebytes = 4096 + 2048
+        t.pyramid(3)
+        assert list(t._levels) == [4, 8]
+        t.normalise(inplace=True)
+        assert not t._levels
+
+    def test_budget(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        t.cachebytes = 2048
+        levels = t.pyramid(3)
+        assert list(t._levels) == [8]
+        assert levels[0].data.flags.writeable
+
+        t = self.make_tseries()
+        d = t.downsample(4)
+        assert not t._levels
+        d.data[0] = 1.0
+
+
+class TestFold(object):
+
+    """"""
+
+    tsamp = 1e-3
+
+    def test_foldmany(self) -> None:
+
+        """"""
+
+        nsamp = 100000
+        periods = np.array([0.1, 0.137])
+        t = np.arange(nsamp) * self.tsamp
+        data = np.zeros(nsamp, dtype=np.float32)
+        for period in periods:
+            data[(t % period) < 0.1 * period] += 1.0
+        ts = TimeSeries(data, self.tsamp)
+
+        cube = ts.foldmany(periods, bins=20, subints=4)
+        assert cube.shape == (2, 4, 1, 20)
+        for profs in cube:
+            prof = profs.sum(axis=(0, 1))
+            assert prof[:2].min() > 1.5 * np.median(prof)
+
+    def test_single(self) -> None:
+
+        """"""
+
+        data = np.tile(np.arange(8, dtype=np.float32), 16)
+        ts = TimeSeries(data, self.tsamp)
+        cube = ts.foldmany([8e-3], bins=8, subints=2)
+        assert np.allclose(cube[0, :, 0], np.arange(8))
+
+    def test_bad_pdots(self) -> None:
+
+        """"""
+
+        ts = TimeSeries(np.zeros(16, dtype=np.float32), self.tsamp)
+        with raises(ValueError):
+            ts.foldmany([1.0, 2.0], pdots=[0.0])
+
+
+class TestLazy(object):
+
+    """"""
+
+    tsamp = 1e-3
+
+    def make_tseries(self) -> TimeSeries:
+
+        """"""
+
+        rng = np.random.default_rng(42)
+        data = rng.normal(size=8192) + np.linspace(0, 5, 8192)
+        return TimeSeries(data.astype(np.float32), self.tsamp)
+
+    def test_fused(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        for method in ["runmed", "blockmedian", "decimated"]:
+            lazy = t.lazy().normalise().deredden(0.064, method=method).downsample(4)
+            lazy.chunk = 1024
+            result = lazy.compute()
+            ref = t.normalise().deredden(0.064, method=method).downsample(4)
+            assert np.isclose(result.tsamp, ref.tsamp)
+            assert result.data.dtype == np.float32
+            assert np.allclose(result.data, ref.data, atol=1e-5)
+
+    def test_normalise_after(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        lazy = t.lazy().downsample(2).normalise()
+        lazy.chunk = 1000
+        out = np.empty(4096, dtype=np.float32)
+        result = lazy.compute(out=out)
+        assert result.data is out
+        assert np.allclose(out, t.downsample(2).normalise().data, atol=1e-5)
+
+    def test_bad_factor(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        with raises(ValueError):
+            t.lazy().downsample(1.5)
+
+
+class TestQuantized(object):
+
+    """"""
+
+    tsamp = 1e-3
+
+    def make_tseries(self) -> TimeSeries:
+
+        """"""
+
+        rng = np.random.default_rng(42)
+        data = rng.normal(size=10000).astype(np.float32)
+        return TimeSeries(data, self.tsamp, meta=Metadata({"dm": 10.0}))
+
+    def test_lossless(self) -> None:
+
+        """"""
+
+        data = np.arange(10000, dtype=np.float32) % 200
+        t = TimeSeries(data, self.tsamp)
+        for dtype in ["int8", "int16", "float16"]:
+            q = t.quantize(dtype=dtype, block=1000)
+            assert np.array_equal(q.dequantize().data, data)
+
+    def test_lossy(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        for dtype, tol in [("int8", 5e-2), ("int16", 5e-4), ("float16", 5e-3)]:
+            q = t.quantize(dtype=dtype, block=1000)
+            assert q.nbytes < t.data.nbytes
+            d = q.dequantize()
+            assert d.data.dtype == np.float32
+            assert np.abs(d.data - t.data).max() < tol
+
+    def test_offset(self) -> None:
+
+        """"""
+
+        rng = np.random.default_rng(7)
+        data = rng.normal(5000.0, 2.0, size=10000).astype(np.float32)
+        t = TimeSeries(data, self.tsamp)
+        d = t.quantize(dtype="float16", block=1000).dequantize()
+        assert np.abs(d.data - data).max() < 1e-2
+
+        data = rng.normal(0.0, 1e5, size=10000).astype(np.float32)
+        t = TimeSeries(data, self.tsamp)
+        d = t.quantize(dtype="float16", block=1000).dequantize()
+        assert np.all(np.isfinite(d.data))
+        assert np.abs(d.data - data).max() < 1e-3 * np.abs(data).max()
+
+    def test_samples(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        q = t.quantize(block=1000)
+        full = q.dequantize().data
+        assert np.array_equal(q.samples(1500, 3700), full[1500:3700])
+
+    def test_lazy(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        q = t.quantize(dtype="int16")
+        result = q.lazy().normalise().downsample(4).compute()
+        ref = q.dequantize().normalise().downsample(4)
+        assert np.allclose(result.data, ref.data, atol=1e-5)
+
+    def test_qts(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        q = t.quantize(block=1000)
+        with tempfile.TemporaryDirectory() as tmp:
+            f = Path(tmp).joinpath("test.qts")
+            q.toqts(f)
+            for mmap in [False, True]:
+                test = QuantizedTimeSeries.fromqts(f, mmap=mmap)
+                assert test.tsamp == self.tsamp
+                assert test.meta["dm"] == 10.0
+                assert np.array_equal(test.codes, q.codes)
+                assert np.array_equal(test.dequantize().data, q.dequantize().data)
+
+    def test_numpy_meta(self) -> None:
+
+        """"""
+
+        t = self.make_tseries()
+        t.meta = Metadata({"nsamp": np.int64(10000), "dm": np.float32(3.5)})
+        with tempfile.TemporaryDirectory() as tmp:
+            f = Path(tmp).joinpath("test.qts")
+            t.quantize().toqts(f)
+            test = QuantizedTimeSeries.fromqts(f)
+            assert test.meta["nsamp"] == 10000
+            assert test.meta["dm"] == 3.5
+
+            t.meta = Metadata({"bad": object()})
+            with raises(TypeError):
+                t.quantize().toqts(f)
+
+
+class TestStore(object):
+
+    """"""
+
+    tsamp = 1e-3
+
+    def test_store(self) -> None:
+
+        """"""
+
+        rng = np.random.default_rng(42)
+        data = rng.normal(size=(3, 2500)).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp).joinpath("store")
+            store = TimeSeriesStore.create(path, self.tsamp, shard=1000)
+            for i, row in enumerate(data):
+                meta = Metadata({"dm": float(i), "nsamp": row.size})
+                store.add("dm{}".format(i), TimeSeries(row, self.tsamp, meta=meta))
+
+            store = TimeSeriesStore.open(path)
+            assert store.names == ["dm0", "dm1", "dm2"]
+
+            t = store.load("dm1", 900, 2100)
+            assert t.tsamp == self.tsamp
+            assert t.meta["nsamp"] == 1200
+            assert np.array_equal(t.data, data[1, 900:2100])
+
+            s = store.window(["dm2", "dm0"], 1999, 2500)
+            assert np.array_equal(s.data, data[[2, 0], 1999:2500])
+            assert np.allclose(s.dms, [2.0, 0.0])
+
+            with raises(KeyError):
+                store.load("dm3")
+
+    def test_numpy_meta(self) -> None:
+
+        """"""
+
+        data = np.zeros(100, dtype=np.float32)
+        meta = Metadata({"dm": np.float32(3.5), "nsamp": np.int64(100)})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp).joinpath("store")
+            store = TimeSeriesStore.create(path, self.tsamp)
+            store.add("dm", TimeSeries(data, self.tsamp, meta=meta))
+
+            store = TimeSeriesStore.open(path)
+            assert store.load("dm").meta["nsamp"] == 100
+            s = store.window(["dm"], 0, 100)
+            assert s.dms.dtype == np.float64
+            assert s.dms.tolist() == [3.5]
+
+
+class TestLoader(object):
+
+    """"""
+
+    refdata = np.arange(16)
+
+    fnames = [
+        "test_fake_presto_radio.dat",
+        "test_fake_presto_radio_breaks.dat",
+        "test_fake_presto_xray.dat",
+        "test_fake_sigproc_float32.tim",
+        "test_fake_sigproc_uint8.tim",
+        "test_fake_sigproc_int8.tim",
+    ]
+
+    @staticmethod
+    def run(coro: Any) -> Any:
+
+        """"""
+
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def test_load_many(self) -> None:
+
+        """"""
+
+        fs = [datadir.joinpath(fname) for fname in self.fnames]
+        results = dict(load_many(fs, workers=2))
+        assert sorted(results) == sorted(fs)
+        for t in results.values():
+            assert t.tsamp == 64e-6
+            assert np.allclose(t.data, self.refdata)
+
+    def test_aload_many(self) -> None:
+
+        """"""
+
+        fs = [datadir.joinpath(fname) for fname in self.fnames]
+
+        async def collect() -> dict:
+            return {f: t async for f, t in aload_many(fs, workers=2)}
+
+        results = self.run(collect())
+        assert sorted(results) == sorted(fs)
+        for t in results.values():
+            assert np.allclose(t.data, self.refdata)
+
+    def test_errors(self) -> None:
+
+        """"""
+
+        fs = [datadir.joinpath("non_existent.dat")]
+        with raises(FileNotFoundError):
+            list(load_many(fs))
+
+        async def collect() -> list:
+            return [r async for r in aload_many(fs)]
+
+        with raises(FileNotFoundError):
+            self.run(collect())
+
+    def test_bounded(self, monkeypatch) -> None:
+
+        """"""
+
+        f = datadir.joinpath(self.fnames[0])
+        started = []
+        fromfile = TimeSeries.fromfile
+
+        def load(fname: str, mmap: bool = False) -> TimeSeries:
+            started.append(fname)
+            return fromfile(fname, mmap)
+
+        monkeypatch.setattr(TimeSeries, "fromfile", load)
+
+        async def first() -> int:
+            async for _ in aload_many([f] * 200, workers=2):
+                await asyncio.sleep(0.05)
+                return len(started)
+            return 0
+
+        assert self.run(first()) <= 5
+        assert len(started) <= 8
+
+
+class TestInject(object):
+
+    """"""
+
+    tsamp = 1e-3
+
+    def test_generate(self) -> None:
+
+        """"""
+
+        periods = [0.1, 0.2, 0.37]
+        s = TimeSeriesStack.generate(10.0, self.tsamp, periods, seeds=[1, 2, 3])
+        assert s.data.shape == (3, 10000)
+        assert s.data.dtype == np.float32
+        assert [m["seed"] for m in s.metas] == [1, 2, 3]
+
+        again = TimeSeriesStack.generate(10.0, self.tsamp, periods[1:], seeds=[2, 3])
+        assert np.array_equal(again.data, s.data[1:])
+
+        cube = s[2].foldmany([0.37], bins=32)
+        prof = cube[0].ravel()
+        assert prof.argmax() in (15, 16)
+
+    def test_processes(self) -> None:
+
+        """"""
+
+        periods = np.linspace(0.1, 0.5, 6)
+        seeds = np.arange(6)
+        serial = TimeSeriesStack.generate(2.0, self.tsamp, periods, seeds=seeds)
+        parallel = TimeSeriesStack.generate(
+            2.0,
+            self.tsamp,
+            periods,
+            seeds=seeds,
+            processes=2,
+        )
+        assert np.array_equal(serial.data, parallel.data)
+
+    def test_inject(self) -> None:
+
+        """"""
+
+        base = TimeSeries(np.zeros(5000, dtype=np.float32), self.tsamp)
+        periods = [0.1, 0.2]
+        s = TimeSeriesStack.generate(0.0, self.tsamp, periods, amp=[5, 10], base=base)
+        assert s.data.shape == (2, 5000)
+        assert np.allclose(np.sqrt((s.data ** 2).sum(axis=1)), [5, 10], rtol=1e-4)
+        assert not base.data.any()
+
+
+class TestFFT(object):
+
+    """"""
+
+    def test_fast(self) -> None:
+
+        """"""
+
+        rng = np.random.default_rng(7)
+        data = rng.normal(size=1009).astype(np.float32)
+        t = TimeSeries(data, 1e-3, meta=Metadata({"nsamp": data.size}))
+
+        f = t.fft()
+        assert f.nsamp == 1024
+        assert f.meta["nsamp"] == 1024
+        assert f.data.dtype == np.complex64
+        assert f.data.size == 513
+
+        padded = np.full(1024, data.mean(dtype=np.float64))
+        padded[: data.size] = data
+        assert np.allclose(f.data, np.fft.rfft(padded), atol=1e-3)
+
+        f = t.fft(pad="trim")
+        assert f.nsamp == 1000
+        assert np.allclose(f.data, np.fft.rfft(data[:1000]), atol=1e-3)
+
+        f = t.fft(pad=None)
+        assert f.nsamp == 1009
+        assert t.meta["nsamp"] == 1009
+
+    def test_workers(self) -> None:
+
+        """"""
+
+        data = np.random.default_rng(3).normal(size=4096).astype(np.float32)
+        t = TimeSeries(data, 1e-3)
+        out = np.empty(2049, dtype=np.complex64)
+        f = t.fft(workers=2, out=out)
+        assert f.data is out
+        assert np.allclose(out, t.fft().data, atol=1e-3)
+
+        with raises(ValueError):
+            t.fft(out=np.empty(10, dtype=np.complex64))
+        with raises(ValueError):
+            t.fft(pad="slow")
+
+    def test_stack(self) -> None:
+
+        """"""
+
+        data = np.random.default_rng(4).normal(size=(6, 1009)).astype(np.float32)
+        s = TimeSeriesStack.fromnpy(data, 1e-3, dms=np.arange(6.0))
+        for workers in [None, 3]:
+            f = s.fft(workers=workers)
+            assert f.data.shape == (6, 513)
+            assert f.nsamp == 1024
+            assert f.dms.tolist() == list(range(6))
+            for i in range(6):
+                t = TimeSeries(data[i], 1e-3)
+                assert np.allclose(f.data[i], t.fft().data, atol=1e-4)
+
+
+class TestSegmented(object):
+
+    """"""
+
+    def test_noise(self) -> None:
+
+        """"""
+
+        rng = np.random.default_rng(11)
+        nsamp = 1 << 16
+        data = rng.normal(size=nsamp).astype(np.float32)
+        data += np.sin(2 * np.pi * 100 * np.arange(nsamp) / 1024).astype(np.float32)
+        t = TimeSeries(data, 1e-3, meta=Metadata({"nsamp": nsamp}))
+
+        f = t.segmented_spectrum(1024)
+        assert f.nsamp == 1024
+        assert f.meta["nsamp"] == 1024
+        assert f.data.size == 513
+        assert np.isclose(np.median(f.pows[200:]), 1.0, atol=0.05)
+        assert f.pows.argmax() == 100
+        assert np.isclose(f.freq[100], 100 / 1.024)
+
+        g = t.segmented_spectrum(1024, workers=4)
+        assert np.array_equal(f.data, g.data)
+
+        boxcar = t.segmented_spectrum(1024, overlap=0, window=None)
+        assert np.isclose(np.median(boxcar.pows[200:]), 1.0, atol=0.05)
+
+        with raises(ValueError):
+            t.segmented_spectrum(1024, overlap=1024)
+        with raises(ValueError):
+            t.segmented_spectrum(1024, window="triangle")
+
+    def test_mmap(self) -> None:
+
+        """"""
+
+        meta = TimeSeries.fromdat(datadir.joinpath("test_fake_presto_radio.dat")).meta
+        data = np.random.default_rng(2).normal(size=5000).astype(np.float32)
+        t = TimeSeries(data, meta["tsamp"], meta=meta)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            f = Path(tmp).joinpath("test.dat")
+            with TimeSeriesWriter(f, meta) as writer:
+                writer.write(t)
+            m = TimeSeries.fromdat(f, mmap=True)
+            assert isinstance(m.data, np.memmap)
+            assert np.allclose(
+                m.segmented_spectrum(512).data,
+                t.segmented_spectrum(512).data,
+            )